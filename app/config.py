@@ -1,9 +1,18 @@
-from pydantic_settings import BaseSettings
-from typing import List
+from functools import cached_property
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Tuple
 
 class Settings(BaseSettings):
+    # Read once at startup; frozen so values can't drift at runtime
+    model_config = SettingsConfigDict(env_file=".env", frozen=True, extra="ignore")
+    
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 3600  # seconds; stay under MySQL wait_timeout
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection before failing
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # opt-in server-side cap on statement run time; 0 disables it
     
     # Security
     SECRET_KEY: str
@@ -14,18 +23,21 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str
     
     # Server
+    ENVIRONMENT: str = "development"
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     DEBUG: bool = False
+    RUN_MIGRATIONS: bool = False  # create missing tables on startup
     
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:3000"
     
     @property
-    def allowed_origins(self) -> List[str]:
-        return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
+    def is_production(self) -> bool:
+        return self.ENVIRONMENT.lower() == "production"
     
-    class Config:
-        env_file = ".env"
+    @cached_property
+    def allowed_origins(self) -> Tuple[str, ...]:
+        return tuple(origin.strip() for origin in self.ALLOWED_ORIGINS.split(","))
 
 settings = Settings()
\ No newline at end of file
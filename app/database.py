@@ -1,15 +1,56 @@
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _json_dumps(value) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+# Single module-level engine; every get_db() session checks out from this pool
+engine = create_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    # JSON columns (connection_params, table_mappings, query_result, ...) go through orjson
+    json_serializer=_json_dumps,
+    json_deserializer=orjson.loads
+)
+
+if settings.DB_STATEMENT_TIMEOUT_MS > 0 and make_url(settings.DATABASE_URL).get_backend_name() == "mysql":
+    @event.listens_for(engine, "connect")
+    def _set_statement_timeout(dbapi_connection, connection_record):
+        """Cap statement run time on each new pooled connection, so runaway
+        SELECTs release their connection instead of pinning it"""
+        cursor = dbapi_connection.cursor()
+        try:
+            # MariaDB (e.g. XAMPP) has no max_execution_time; it takes seconds
+            if "mariadb" in dbapi_connection.get_server_info().lower():
+                cursor.execute(f"SET SESSION max_statement_time={settings.DB_STATEMENT_TIMEOUT_MS / 1000}")
+            else:
+                cursor.execute(f"SET SESSION max_execution_time={int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+        finally:
+            cursor.close()
+
+# Keep loaded attributes after commit; server-generated columns are fetched at
+# flush time via eager_defaults on the models, so no db.refresh() is needed
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
 def get_db():
+    """One session per request; the connection goes back to the pool on close"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def init_db():
+    """Create any missing tables. Run once at deploy time, not per worker."""
+    # Import models so they are registered on Base.metadata
+    import app.models  # noqa: F401
+    Base.metadata.create_all(bind=engine)
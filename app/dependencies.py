@@ -1,20 +1,56 @@
+import hashlib
+import time
+from typing import Optional
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
-from app.utils.security import verify_token
+from app.utils.cache import TTLCache
+from app.utils.security import decode_access_token
 
 # Gunakan HTTPBearer untuk token header ATAU cookie
 security = HTTPBearer(auto_error=False)
 
-async def get_current_user(
+# Headers for 401 replies; a fresh HTTPException is raised each time, since a
+# shared instance raised from concurrent threadpool workers keeps the last
+# request's traceback frames alive
+_AUTH_HEADERS = {"WWW-Authenticate": "Bearer"}
+
+# token digest -> (username, exp); skips JWT decode for repeat callers.
+# Rejected tokens are cached as (None, inf) so replaying a bad token fails fast.
+_token_cache = TTLCache(maxsize=10000, ttl=30)
+
+def _resolve_username(token: str) -> Optional[str]:
+    """Verify token, memoizing the decoded subject until the cache TTL or token expiry"""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        username, exp = cached
+        if exp > time.time():
+            return username
+        _token_cache.pop(key)
+        return None
+
+    payload = decode_access_token(token)
+    username = payload.get("sub") if payload else None
+    exp = payload.get("exp") if payload else None
+    if username is None or exp is None:
+        _token_cache.set(key, (None, float("inf")))
+        return None
+    _token_cache.set(key, (username, exp))
+    return username
+
+def get_current_user(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ):
     """
     Get current user from token - support both Header and Cookie
+
+    Declared sync so FastAPI runs the JWT check and DB lookup in its
+    threadpool instead of blocking the event loop.
     """
     token = None
     
@@ -29,22 +65,24 @@ async def get_current_user(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
-            headers={"WWW-Authenticate": "Bearer"},
+            headers=_AUTH_HEADERS,
         )
     
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    username = verify_token(token)
+    username = _resolve_username(token)
     if username is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers=_AUTH_HEADERS,
+        )
     
     user = db.query(User).filter(User.username == username).first()
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers=_AUTH_HEADERS,
+        )
         
     return user
 
@@ -1,31 +1,74 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+import orjson
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import auth_router, users_router, systems_router, chat_router, admin_router
-from app.database import engine, Base
-from app.utils.helpers import setup_logging
+from app.config import settings
+from sqlalchemy import select, text
+from app.database import SessionLocal, engine, init_db
+from app.models.user import UserSystem
+from app.services.database_service import close_bridge_client, get_bridge_client, keep_bridges_warm, warm_bridge_connections
+from app.services.gemini_service import GeminiService
+from app.utils.cache import TTLCache
+from app.utils.helpers import setup_logging, cache_dependency_introspection
 import logging
 
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-# Create database tables
-try:
-    Base.metadata.create_all(bind=engine)
-    logger.info("✅ Database tables created successfully")
-except Exception as e:
-    logger.error(f"❌ Error creating database tables: {e}")
+# Skip FastAPI's repeated dependency signature checks on every request
+cache_dependency_introspection()
+
+def _active_bridge_urls(limit: int = 50) -> set:
+    """Bridge URLs of active systems, for connection warm-up"""
+    with SessionLocal() as db:
+        params = db.execute(
+            select(UserSystem.connection_params).where(UserSystem.is_active == True).limit(limit)
+        ).scalars()
+        return {p["bridge_url"] for p in params if p and p.get("bridge_url")}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema is managed by Alembic / create_superadmin.py; only create tables when asked
+    if settings.RUN_MIGRATIONS:
+        try:
+            init_db()
+            logger.info("✅ Database tables created successfully")
+        except Exception as e:
+            logger.error(f"❌ Error creating database tables: {e}")
+    
+    # App-lifetime services: one Gemini client and one pooled HTTP client for the bridge
+    app.state.gemini = GeminiService()
+    app.state.bridge_client = get_bridge_client()
+    
+    # Prime bridge connections so the first chat doesn't pay TCP/TLS setup
+    try:
+        await warm_bridge_connections(await run_in_threadpool(_active_bridge_urls))
+    except Exception as e:
+        logger.warning(f"Bridge warm-up skipped: {e}")
+    keepalive_task = asyncio.create_task(keep_bridges_warm())
+    try:
+        yield
+    finally:
+        keepalive_task.cancel()
+        await close_bridge_client()
 
 app = FastAPI(
     title="Astral Project API",
     description="AI Assistant for Multiple Database Systems - Enhanced Version",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Enhanced CORS middleware
-from app.config import settings
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
@@ -41,63 +84,80 @@ app.include_router(systems_router, prefix="/systems", tags=["Systems"])
 app.include_router(chat_router, prefix="/chat", tags=["Chat"])
 app.include_router(admin_router, prefix="/admin", tags=["Admin"])
 
+# Constant payloads, serialized once at import
+_ROOT_JSON = orjson.dumps({
+    "message": "🚀 Welcome to Astral Project API v2.0",
+    "version": "2.0.0",
+    "status": "operational",
+    "docs": "/docs",
+    "features": [
+        "Multi-database support",
+        "AI-powered SQL generation", 
+        "Real-time chat",
+        "Admin dashboard",
+        "Enhanced error handling"
+    ]
+})
+
+_INFO_JSON = orjson.dumps({
+    "name": "Astral AI",
+    "version": "2.0.0",
+    "description": "AI-powered database assistant",
+    "supported_databases": ["MySQL", "PostgreSQL", "SQL Server"],
+    "features": [
+        "Natural language to SQL",
+        "Multi-database support", 
+        "Real-time chat interface",
+        "Admin monitoring",
+        "User management"
+    ]
+})
+
 @app.get("/")
 async def root():
-    return {
-        "message": "🚀 Welcome to Astral Project API v2.0",
-        "version": "2.0.0",
-        "status": "operational",
-        "docs": "/docs",
-        "features": [
-            "Multi-database support",
-            "AI-powered SQL generation", 
-            "Real-time chat",
-            "Admin dashboard",
-            "Enhanced error handling"
-        ]
-    }
+    return Response(content=_ROOT_JSON, media_type="application/json")
+
+# Probes hit /health every few seconds; reuse the last DB ping for a short window
+_health_cache = TTLCache(maxsize=1, ttl=5)
+
+def _db_ping() -> Optional[str]:
+    """Return None if the database answers, otherwise the error message"""
+    cached = _health_cache.get("db")
+    if cached is not None:
+        return cached[0]
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        error = None
+    except Exception as e:
+        error = str(e)
+    _health_cache.set("db", (error,))
+    return error
 
 @app.get("/health")
 async def health_check():
     """Enhanced health check dengan database connection test"""
-    try:
-        # Test database connection
-        from app.database import SessionLocal
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
-        
+    error = await run_in_threadpool(_db_ping)
+    if error is None:
         return {
             "status": "healthy",
             "database": "connected", 
             "ai_service": "ready",
             "timestamp": "2024-01-01T00:00:00Z"
         }
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        return {
-            "status": "degraded",
-            "database": "error",
-            "ai_service": "ready", 
-            "error": str(e)
-        }
+    
+    logger.error(f"Health check failed: {error}")
+    return {
+        "status": "degraded",
+        "database": "error",
+        "ai_service": "ready", 
+        "error": error
+    }
 
 @app.get("/info")
 async def system_info():
     """System information endpoint"""
-    return {
-        "name": "Astral AI",
-        "version": "2.0.0",
-        "description": "AI-powered database assistant",
-        "supported_databases": ["MySQL", "PostgreSQL", "SQL Server"],
-        "features": [
-            "Natural language to SQL",
-            "Multi-database support", 
-            "Real-time chat interface",
-            "Admin monitoring",
-            "User management"
-        ]
-    }
+    return Response(content=_INFO_JSON, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
@@ -106,5 +166,7 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
-        log_level="info"
+        log_level="info",
+        ws_ping_interval=20,
+        ws_ping_timeout=20
     )
\ No newline at end of file
@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index("ix_chat_sessions_user_updated", "user_id", "updated_at"),
+        Index("ix_chat_sessions_user_created", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
@@ -12,14 +19,30 @@ class ChatSession(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # No FK constraint in the schema, so the join is declared explicitly.
+    # lazy="raise" forces callers to eager-load instead of issuing a hidden query.
+    system = relationship(
+        "UserSystem",
+        primaryjoin="foreign(ChatSession.system_id) == UserSystem.id",
+        lazy="raise",
+        viewonly=True
+    )
+
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index("ix_chat_messages_session_created", "session_id", "created_at"),
+        Index("ix_chat_messages_created", "created_at"),
+        Index("ix_chat_messages_user_created", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, nullable=False)
+    # Messages go away with their session (database-side cascade)
+    session_id = Column(Integer, ForeignKey("chat_sessions.id", ondelete="CASCADE", name="fk_chat_messages_session"), nullable=False)
     user_id = Column(Integer, nullable=False)
     message = Column(Text, nullable=False)
     is_user = Column(Boolean, default=True)  # True for user, False for AI
     sql_query = Column(Text)
-    query_result = Column(Text)
+    query_result = Column(JSON().with_variant(JSONB, "postgresql"))  # stored decoded, no json round-trip
     created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
@@ -20,6 +22,11 @@ class User(Base):
 
 class UserSystem(Base):
     __tablename__ = "user_systems"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # get_systems: WHERE user_id = ? AND is_active
+        Index("ix_user_systems_user_active", "user_id", "is_active"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
@@ -29,7 +36,8 @@ class UserSystem(Base):
     db_port = Column(Integer, nullable=False)
     db_name = Column(String(255), nullable=False)
     db_username = Column(String(255), nullable=False)
-    db_password = Column(String(255), nullable=False)
+    # Only the bridge calls need it; load with undefer(UserSystem.db_password)
+    db_password = Column(String(255), nullable=False, deferred=True)
     
     connection_params = Column(JSON, default=dict)
     table_mappings = Column(JSON, default=dict)
@@ -38,4 +46,13 @@ class UserSystem(Base):
     
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # No FK constraint in the schema, so the join is declared explicitly.
+    # lazy="raise" forces callers to eager-load instead of issuing a hidden query.
+    user = relationship(
+        "User",
+        primaryjoin="foreign(UserSystem.user_id) == User.id",
+        lazy="raise",
+        viewonly=True
+    )
\ No newline at end of file
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, contains_eager, joinedload
 from typing import List, Optional
 import logging
+import threading
 from app.database import get_db
 from app.models.user import User, UserSystem
 from app.models.chat import ChatSession, ChatMessage
@@ -10,29 +13,51 @@ from app.schemas import (
     UserCreateAdminSchema, 
     UserUpdateAdminSchema, 
     AdminStatsSchema, 
-    SystemAdminSchema
+    SystemAdminSchema,
+    RecentChatItemSchema,
+    AdminSessionItemSchema
 )
+from app.utils.db import record_exists
 from app.dependencies import get_current_admin_user, get_current_superadmin_user
 from app.utils.admin_utils import AdminUtils
+from app.utils.cache import TTLCache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# ... (rest of the code remains the same)
-import logging
+# Validate + dump whole listings in one pydantic-core pass
+_recent_chats_adapter = TypeAdapter(List[RecentChatItemSchema])
+_sessions_adapter = TypeAdapter(List[AdminSessionItemSchema])
 
-router = APIRouter()
-logger = logging.getLogger(__name__)
+# Dashboard analytics scan large tables; 30s staleness is fine for the dashboard
+_dashboard_cache = TTLCache(maxsize=64, ttl=30)
+# Striped locks so tabs polling an expired key run the query once, not once each
+_dashboard_locks = [threading.Lock() for _ in range(16)]
+
+def _cached_dashboard(key: tuple, compute):
+    data = _dashboard_cache.get(key)
+    if data is None:
+        with _dashboard_locks[hash(key) % len(_dashboard_locks)]:
+            data = _dashboard_cache.get(key)
+            if data is None:
+                data = compute()
+                _dashboard_cache.set(key, data)
+    return data
+
+def _set_next_cursor(response: Response, rows: list, limit: int):
+    """Expose the keyset cursor for the next page without changing the list body"""
+    if rows and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1].id)
 
 # ===== ADMIN DASHBOARD =====
 @router.get("/dashboard/stats")
-async def get_admin_dashboard_stats(
+def get_admin_dashboard_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """Get comprehensive statistics for admin dashboard"""
     try:
-        stats = AdminUtils.get_system_stats(db)
+        stats = _cached_dashboard(("stats",), lambda: AdminUtils.get_system_stats(db))
         return {
             "success": True,
             "data": stats,
@@ -43,14 +68,14 @@ async def get_admin_dashboard_stats(
         raise HTTPException(status_code=500, detail="Error retrieving dashboard statistics")
 
 @router.get("/dashboard/user-activity")
-async def get_user_activity(
+def get_user_activity(
     days: int = Query(7, description="Number of days to look back"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """Get user activity data for admin monitoring"""
     try:
-        activity_data = AdminUtils.get_user_activity(db, days)
+        activity_data = _cached_dashboard(("user_activity", days), lambda: AdminUtils.get_user_activity(db, days))
         return {
             "success": True,
             "data": activity_data,
@@ -61,13 +86,13 @@ async def get_user_activity(
         raise HTTPException(status_code=500, detail="Error retrieving user activity")
 
 @router.get("/dashboard/system-usage")
-async def get_system_usage(
+def get_system_usage(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """Get system usage statistics across all users"""
     try:
-        system_usage = AdminUtils.get_system_usage(db)
+        system_usage = _cached_dashboard(("system_usage",), lambda: AdminUtils.get_system_usage(db))
         return {
             "success": True,
             "data": system_usage,
@@ -79,34 +104,40 @@ async def get_system_usage(
 
 # ===== USER MANAGEMENT =====
 @router.get("/users", response_model=List[UserAdminSchema])
-async def get_all_users_admin(
-    skip: int = Query(0, description="Number of records to skip"),
+def get_all_users_admin(
+    response: Response,
+    cursor: Optional[int] = Query(None, description="Return records with id below this cursor (X-Next-Cursor of the previous page)"),
     limit: int = Query(100, description="Number of records to return"),
     active_only: bool = Query(True, description="Return only active users"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
-    """Get all users (admin only)"""
+    """Get all users (admin only), newest first with keyset pagination"""
     query = db.query(User)
     
     if active_only:
         query = query.filter(User.is_active == True)
+    if cursor is not None:
+        query = query.filter(User.id < cursor)
     
-    users = query.offset(skip).limit(limit).all()
+    users = query.order_by(User.id.desc()).limit(limit).all()
+    _set_next_cursor(response, users, limit)
     return users
 
 @router.post("/users", response_model=UserAdminSchema)
-async def create_user_admin(
+def create_user_admin(
     user_data: UserCreateAdminSchema,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_superadmin_user)
 ):
     """Create new user (superadmin only)"""
     # Check if user already exists
-    if db.query(User).filter(User.email == user_data.email).first():
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    if db.query(User).filter(User.username == user_data.username).first():
+    existing = db.query(User.email, User.username).filter(
+        or_(User.email == user_data.email, User.username == user_data.username)
+    ).first()
+    if existing:
+        if existing.email.lower() == user_data.email.lower():  # MySQL collation is case-insensitive
+            raise HTTPException(status_code=400, detail="Email already registered")
         raise HTTPException(status_code=400, detail="Username already taken")
     
     # Create new user with admin privileges
@@ -125,48 +156,46 @@ async def create_user_admin(
     
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
     
+    _dashboard_cache.clear()
     logger.info(f"Admin {current_user.username} created user: {user_data.username}")
     return db_user
 
 @router.get("/users/{user_id}", response_model=UserAdminSchema)
-async def get_user_admin(
+def get_user_admin(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """Get specific user details (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     return user
 
 @router.put("/users/{user_id}", response_model=UserAdminSchema)
-async def update_user_admin(
+def update_user_admin(
     user_id: int,
     user_data: UserUpdateAdminSchema,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_superadmin_user)
 ):
     """Update user (superadmin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Update fields if provided
     if user_data.email is not None:
         # Check if email is already taken by another user
-        existing = db.query(User).filter(User.email == user_data.email, User.id != user_id).first()
-        if existing:
+        if record_exists(db, db.query(User.id).filter(User.email == user_data.email, User.id != user_id)):
             raise HTTPException(status_code=400, detail="Email already taken")
         user.email = user_data.email
     
     if user_data.username is not None:
         # Check if username is already taken by another user
-        existing = db.query(User).filter(User.username == user_data.username, User.id != user_id).first()
-        if existing:
+        if record_exists(db, db.query(User.id).filter(User.username == user_data.username, User.id != user_id)):
             raise HTTPException(status_code=400, detail="Username already taken")
         user.username = user_data.username
     
@@ -183,13 +212,13 @@ async def update_user_admin(
         user.is_superadmin = user_data.is_superadmin
     
     db.commit()
-    db.refresh(user)
     
+    _dashboard_cache.clear()
     logger.info(f"Superadmin {current_user.username} updated user: {user.username}")
     return user
 
 @router.delete("/users/{user_id}")
-async def deactivate_user_admin(
+def deactivate_user_admin(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_superadmin_user)
@@ -198,32 +227,40 @@ async def deactivate_user_admin(
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot deactivate your own account")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     user.is_active = False
     db.commit()
     
+    _dashboard_cache.clear()
     logger.info(f"Superadmin {current_user.username} deactivated user: {user.username}")
     return {"message": "User deactivated successfully"}
 
 # ===== SYSTEM MANAGEMENT =====
 @router.get("/systems", response_model=List[SystemAdminSchema])
-async def get_all_systems_admin(
-    skip: int = Query(0, description="Number of records to skip"),
+def get_all_systems_admin(
+    response: Response,
+    cursor: Optional[int] = Query(None, description="Return records with id below this cursor (X-Next-Cursor of the previous page)"),
     limit: int = Query(100, description="Number of records to return"),
     active_only: bool = Query(True, description="Return only active systems"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
-    """Get all systems across all users (admin only)"""
-    query = db.query(UserSystem).join(User, UserSystem.user_id == User.id)
+    """Get all systems across all users (admin only), newest first with keyset pagination"""
+    query = db.query(UserSystem).join(User, UserSystem.user_id == User.id).options(
+        # Owners come from the join itself; only id + email are selected
+        contains_eager(UserSystem.user).load_only(User.email)
+    )
     
     if active_only:
         query = query.filter(UserSystem.is_active == True)
+    if cursor is not None:
+        query = query.filter(UserSystem.id < cursor)
     
-    systems = query.offset(skip).limit(limit).all()
+    systems = query.order_by(UserSystem.id.desc()).limit(limit).all()
+    _set_next_cursor(response, systems, limit)
     
     # Convert to response model
     result = []
@@ -231,7 +268,7 @@ async def get_all_systems_admin(
         result.append({
             "id": system.id,
             "user_id": system.user_id,
-            "user_email": system.user.email,
+            "user_email": system.user.email if system.user else None,
             "system_name": system.system_name,
             "system_type": system.system_type,
             "db_host": system.db_host,
@@ -243,17 +280,17 @@ async def get_all_systems_admin(
     return result
 
 @router.get("/systems/{system_id}")
-async def get_system_admin(
+def get_system_admin(
     system_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """Get specific system details (admin only)"""
-    system = db.query(UserSystem).filter(UserSystem.id == system_id).first()
+    system = db.get(UserSystem, system_id, options=[joinedload(UserSystem.user)])
     if not system:
         raise HTTPException(status_code=404, detail="System not found")
     
-    user = db.query(User).filter(User.id == system.user_id).first()
+    user = system.user
     
     return {
         "id": system.id,
@@ -280,81 +317,88 @@ async def get_system_admin(
 
 # ===== CHAT MONITORING =====
 @router.get("/chats/recent")
-async def get_recent_chats_admin(
+def get_recent_chats_admin(
     limit: int = Query(50, description="Number of recent messages to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """Get recent chat messages across all users (admin only)"""
-    messages = db.query(ChatMessage).join(
+    rows = db.query(ChatMessage, ChatSession, User).join(
         ChatSession, ChatMessage.session_id == ChatSession.id
     ).join(
-        User, ChatSession.user_id == User.id
+        User, ChatMessage.user_id == User.id
     ).order_by(ChatMessage.created_at.desc()).limit(limit).all()
     
-    result = []
-    for msg in messages:
-        session = db.query(ChatSession).filter(ChatSession.id == msg.session_id).first()
-        user = db.query(User).filter(User.id == msg.user_id).first()
-        
-        result.append({
+    result = _recent_chats_adapter.validate_python([
+        {
             "id": msg.id,
-            "user": {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email
-            },
+            "user": {"id": user.id, "username": user.username, "email": user.email},
             "session_id": msg.session_id,
-            "session_name": session.session_name if session else "Unknown",
+            "session_name": session.session_name,
             "message": msg.message,
             "is_user": msg.is_user,
             "sql_query": msg.sql_query,
-            "created_at": msg.created_at.isoformat()
-        })
+            "created_at": msg.created_at
+        }
+        for msg, session, user in rows
+    ])
     
     return {
         "success": True,
-        "data": result,
+        "data": _recent_chats_adapter.dump_python(result, mode="json"),
         "message": "Recent chats retrieved successfully"
     }
 
 @router.get("/chats/sessions")
-async def get_all_sessions_admin(
-    skip: int = Query(0, description="Number of records to skip"),
+def get_all_sessions_admin(
+    cursor: Optional[int] = Query(None, description="Return sessions with id below this cursor (next_cursor of the previous page)"),
     limit: int = Query(100, description="Number of records to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
-    """Get all chat sessions across all users (admin only)"""
-    sessions = db.query(ChatSession).join(
+    """Get all chat sessions across all users (admin only), newest first with keyset pagination"""
+    # Pre-aggregate message counts once instead of grouping the whole join
+    message_counts = db.query(
+        ChatMessage.session_id,
+        func.count(ChatMessage.id).label('message_count')
+    ).group_by(ChatMessage.session_id).subquery()
+    
+    query = db.query(
+        ChatSession,
+        User,
+        UserSystem,
+        func.coalesce(message_counts.c.message_count, 0)
+    ).join(
         User, ChatSession.user_id == User.id
-    ).order_by(ChatSession.updated_at.desc()).offset(skip).limit(limit).all()
+    ).outerjoin(
+        UserSystem, ChatSession.system_id == UserSystem.id
+    ).outerjoin(
+        message_counts, message_counts.c.session_id == ChatSession.id
+    )
+    if cursor is not None:
+        query = query.filter(ChatSession.id < cursor)
     
-    result = []
-    for session in sessions:
-        user = db.query(User).filter(User.id == session.user_id).first()
-        system = db.query(UserSystem).filter(UserSystem.id == session.system_id).first() if session.system_id else None
-        message_count = db.query(ChatMessage).filter(ChatMessage.session_id == session.id).count()
-        
-        result.append({
+    rows = query.order_by(ChatSession.id.desc()).limit(limit).all()
+    
+    result = _sessions_adapter.validate_python([
+        {
             "id": session.id,
-            "user": {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email
-            },
+            "user": {"id": user.id, "username": user.username, "email": user.email},
             "session_name": session.session_name,
             "system": {
                 "id": system.id if system else None,
                 "name": system.system_name if system else None
             },
             "message_count": message_count,
-            "created_at": session.created_at.isoformat(),
-            "updated_at": session.updated_at.isoformat() if session.updated_at else None
-        })
+            "created_at": session.created_at,
+            "updated_at": session.updated_at
+        }
+        for session, user, system, message_count in rows
+    ])
     
     return {
         "success": True,
-        "data": result,
+        "data": _sessions_adapter.dump_python(result, mode="json"),
+        "next_cursor": result[-1].id if len(result) == limit else None,
         "message": "Chat sessions retrieved successfully"
     }
\ No newline at end of file
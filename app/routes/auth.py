@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy import func, or_, update
 from sqlalchemy.orm import Session
-from datetime import timedelta, datetime
+from datetime import timedelta
 from app.database import get_db
 from app.models.user import User
 from app.schemas import UserCreateSchema, UserResponseSchema, UserLoginSchema, TokenSchema
 from app.utils.security import (
     verify_password, 
     get_password_hash, 
+    password_needs_rehash,
     create_access_token, 
     validate_password_strength
 )
@@ -15,6 +17,17 @@ from app.config import settings
 
 router = APIRouter()
 
+def _set_auth_cookie(response: Response, access_token: str):
+    """max_age alone sets the lifetime; secure + strict only in production (HTTPS)"""
+    response.set_cookie(
+        key="access_token",
+        value=access_token,
+        httponly=True,
+        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        samesite="strict" if settings.is_production else "lax",
+        secure=settings.is_production
+    )
+
 @router.post("/register", response_model=UserResponseSchema)
 def register(user_data: UserCreateSchema, db: Session = Depends(get_db)):
     if not validate_password_strength(user_data.password):
@@ -23,10 +36,12 @@ def register(user_data: UserCreateSchema, db: Session = Depends(get_db)):
             detail="Password must be at least 8 characters long and contain uppercase, lowercase letters and numbers"
         )
     
-    if db.query(User).filter(User.email == user_data.email).first():
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    if db.query(User).filter(User.username == user_data.username).first():
+    existing = db.query(User.email, User.username).filter(
+        or_(User.email == user_data.email, User.username == user_data.username)
+    ).first()
+    if existing:
+        if existing.email.lower() == user_data.email.lower():  # MySQL collation is case-insensitive
+            raise HTTPException(status_code=400, detail="Email already registered")
         raise HTTPException(status_code=400, detail="Username already taken")
     
     hashed_password = get_password_hash(user_data.password)
@@ -40,7 +55,6 @@ def register(user_data: UserCreateSchema, db: Session = Depends(get_db)):
     
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 @router.post("/login", response_model=TokenSchema)
@@ -60,9 +74,22 @@ def login(
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     
-    # Update login stats
-    user.last_login = datetime.utcnow()
-    user.login_count = (user.login_count or 0) + 1
+    # Update login stats atomically in the database (no read-modify-write race)
+    values = {
+        # Database clock, like the created_at defaults, so the admin
+        # "active today" window (CURRENT_DATE) compares like with like
+        "last_login": func.now(),
+        "login_count": func.coalesce(User.login_count, 0) + 1
+    }
+    if password_needs_rehash(user.hashed_password):
+        # Upgrade legacy bcrypt hashes to argon2id in the same statement
+        values["hashed_password"] = get_password_hash(login_data.password)
+    db.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -71,22 +98,19 @@ def login(
     )
     
     # ✅ SET COOKIE for browser-based access (Swagger, etc.)
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        expires=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        samesite="lax",
-        secure=False  # Set True in production with HTTPS
-    )
+    _set_auth_cookie(response, access_token)
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/logout")
 def logout(response: Response):
     """Logout by clearing the cookie"""
-    response.delete_cookie(key="access_token")
+    response.delete_cookie(
+        key="access_token",
+        httponly=True,
+        samesite="strict" if settings.is_production else "lax",
+        secure=settings.is_production
+    )
     return {"message": "Successfully logged out"}
 
 @router.get("/me", response_model=UserResponseSchema)
@@ -104,14 +128,6 @@ async def refresh_token(
     )
     
     # Update cookie dengan token baru
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        expires=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        samesite="lax",
-        secure=False
-    )
+    _set_auth_cookie(response, access_token)
     
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
@@ -1,33 +1,104 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-import json
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import and_, delete, update
+from sqlalchemy.orm import Session, joinedload, undefer
+from sqlalchemy.sql import func
+import asyncio
 import logging
-from datetime import datetime
-from app.database import get_db
+from typing import List, Optional
+from app.database import SessionLocal, get_db
 from app.models.user import User, UserSystem
 from app.models.chat import ChatSession, ChatMessage
 from app.schemas import ChatMessageCreateSchema, ChatMessageResponseSchema, ChatSessionCreateSchema, ChatSessionResponseSchema, ChatWithSystemSchema
 from app.dependencies import get_current_active_user
 from app.services.websocket import manager
-from app.services.gemini_service import GeminiService
 from app.services.database_service import DatabaseService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# List endpoints dump through pydantic-core and return ORJSONResponse directly,
+# skipping FastAPI's jsonable_encoder walk over every row
+_sessions_adapter = TypeAdapter(List[ChatWithSystemSchema])
+_messages_adapter = TypeAdapter(List[ChatMessageResponseSchema])
+
+def _persist_user_message(session_id: int, user_id: int, message: str):
+    """Insert the user's chat message on its own short-lived session"""
+    db = SessionLocal()
+    try:
+        db.add(ChatMessage(
+            session_id=session_id,
+            user_id=user_id,
+            message=message,
+            is_user=True
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+def _load_chat_target(db: Session, session_id: int, user_id: int, system_id: Optional[int]):
+    """Resolve the chat session and the system it should query"""
+    # Verify session, loading its system in the same round trip
+    session = db.query(ChatSession).options(
+        joinedload(ChatSession.system).undefer(UserSystem.db_password)
+    ).filter(
+        ChatSession.id == session_id,
+        ChatSession.user_id == user_id
+    ).first()
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Get system
+    system_id = system_id or session.system_id
+    if not system_id:
+        raise HTTPException(status_code=400, detail="Pilih sistem database terlebih dahulu")
+    
+    if system_id == session.system_id:
+        system = session.system
+    else:
+        system = db.get(UserSystem, system_id, options=[undefer(UserSystem.db_password)])
+    if system is None or system.user_id != user_id or not system.is_active:
+        raise HTTPException(status_code=404, detail="Sistem database tidak ditemukan")
+    
+    return session, system
+
+def _save_ai_message(db: Session, ai_message: ChatMessage):
+    """Commit the AI reply; created_at is loaded during flush (eager_defaults)"""
+    db.add(ai_message)
+    db.commit()
+
+def _touch_session(session_id: int):
+    """Bump the session's updated_at after the response has been sent"""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(ChatSession)
+            .where(ChatSession.id == session_id)
+            .values(updated_at=func.now())
+        )
+        db.commit()
+    finally:
+        db.close()
+
+async def _notify_new_message(user_id: int, event: dict):
+    """Push a chat event over the user's WebSockets (coalesced per tick)"""
+    manager.enqueue(user_id, event)
+
 @router.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: int):
     await manager.connect(websocket, user_id)
     try:
+        # Keepalive uses protocol-level PING/PONG frames (uvicorn ws_ping_interval),
+        # so this loop only waits for the client to disconnect
         while True:
-            data = await websocket.receive_text()
-            if data == "ping":
-                await websocket.send_text("pong")
+            await websocket.receive_text()
     except WebSocketDisconnect:
         manager.disconnect(websocket, user_id)
 
 @router.post("/sessions", response_model=ChatSessionResponseSchema)
-async def create_chat_session(
+def create_chat_session(
     session_data: ChatSessionCreateSchema,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -41,32 +112,27 @@ async def create_chat_session(
     
     db.add(db_session)
     db.commit()
-    db.refresh(db_session)
     
     logger.info(f"User {current_user.id} created chat session: {session_data.session_name}")
     return db_session
 
 @router.get("/sessions", response_model=list[ChatWithSystemSchema])
-async def get_chat_sessions(
+def get_chat_sessions(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get chat sessions with system info"""
-    sessions = db.query(ChatSession).filter(
+    rows = db.query(ChatSession, UserSystem.system_name).outerjoin(
+        UserSystem, and_(
+            UserSystem.id == ChatSession.system_id,
+            UserSystem.user_id == current_user.id
+        )
+    ).filter(
         ChatSession.user_id == current_user.id
     ).order_by(ChatSession.updated_at.desc()).all()
     
-    enhanced_sessions = []
-    for session in sessions:
-        system_name = None
-        if session.system_id:
-            system = db.query(UserSystem).filter(
-                UserSystem.id == session.system_id,
-                UserSystem.user_id == current_user.id
-            ).first()
-            system_name = system.system_name if system else None
-        
-        session_dict = {
+    enhanced_sessions = _sessions_adapter.validate_python([
+        {
             "id": session.id,
             "user_id": session.user_id,
             "system_id": session.system_id,
@@ -75,52 +141,54 @@ async def get_chat_sessions(
             "updated_at": session.updated_at,
             "system_name": system_name
         }
-        enhanced_sessions.append(session_dict)
+        for session, system_name in rows
+    ])
     
-    return enhanced_sessions
+    return ORJSONResponse(_sessions_adapter.dump_python(enhanced_sessions, mode="json"))
 
 @router.get("/sessions/{session_id}/messages", response_model=list[ChatMessageResponseSchema])
-async def get_chat_messages(
+def get_chat_messages(
     session_id: int,
+    before_id: Optional[int] = Query(None, description="Return messages before this id (X-Next-Cursor of the previous page)"),
+    limit: int = Query(50, ge=1, le=200, description="Number of messages to return"),
+    include_results: bool = Query(True, description="Include query_result payloads (can be large)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get chat messages"""
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
-    
-    if not session:
+    """Get chat messages, latest page first; each page is oldest-first and the cursor walks back in time"""
+    session = db.get(ChatSession, session_id)
+    if session is None or session.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.session_id == session_id
-    ).order_by(ChatMessage.created_at.asc()).all()
-    
-    enhanced_messages = []
-    for msg in messages:
-        query_result = None
-        if msg.query_result:
-            try:
-                query_result = json.loads(msg.query_result)
-            except:
-                query_result = {"raw": msg.query_result}
-        
-        msg_dict = {
-            "id": msg.id,
-            "message": msg.message,
-            "is_user": msg.is_user,
-            "sql_query": msg.sql_query,
-            "query_result": query_result,
-            "created_at": msg.created_at
-        }
-        enhanced_messages.append(msg_dict)
+    if include_results:
+        query = db.query(ChatMessage)
+    else:
+        # Transcript only: never fetch or parse the result blobs
+        query = db.query(
+            ChatMessage.id,
+            ChatMessage.message,
+            ChatMessage.is_user,
+            ChatMessage.sql_query,
+            ChatMessage.created_at
+        )
+    query = query.filter(ChatMessage.session_id == session_id)
+    if before_id is not None:
+        query = query.filter(ChatMessage.id < before_id)
+    # Anchor at the tail so a client without a cursor sees the most recent history
+    messages = query.order_by(ChatMessage.id.desc()).limit(limit).all()
+    messages.reverse()
     
-    return enhanced_messages
+    # query_result is a JSON column, so rows validate straight from the ORM objects/rows
+    enhanced_messages = _messages_adapter.validate_python(messages, from_attributes=True)
+    response = ORJSONResponse(_messages_adapter.dump_python(enhanced_messages, mode="json"))
+    if len(messages) == limit:
+        response.headers["X-Next-Cursor"] = str(messages[0].id)
+    return response
 
 @router.post("/sessions/{session_id}/messages", response_model=ChatMessageResponseSchema)
 async def send_chat_message(
+    request: Request,
+    background: BackgroundTasks,
     session_id: int,
     message_data: ChatMessageCreateSchema,
     db: Session = Depends(get_db),
@@ -128,59 +196,32 @@ async def send_chat_message(
 ):
     """Universal chat - works with ANY database"""
     
-    # Verify session
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
-    
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    # Get system
-    system_id = message_data.system_id or session.system_id
-    if not system_id:
-        raise HTTPException(status_code=400, detail="Pilih sistem database terlebih dahulu")
-    
-    system = db.query(UserSystem).filter(
-        UserSystem.id == system_id,
-        UserSystem.user_id == current_user.id,
-        UserSystem.is_active == True
-    ).first()
-    
-    if not system:
-        raise HTTPException(status_code=404, detail="Sistem database tidak ditemukan")
-    
-    # Save user message
-    user_message = ChatMessage(
-        session_id=session_id,
-        user_id=current_user.id,
-        message=message_data.message,
-        is_user=True
+    # DB work runs in the threadpool; the sync session never blocks the event loop
+    _, system = await run_in_threadpool(
+        _load_chat_target, db, session_id, current_user.id, message_data.system_id
     )
-    db.add(user_message)
-    db.commit()
-    db.refresh(user_message)
     
-    # Initialize services
-    db_config = {
-        'system_type': system.system_type,
-        'db_host': system.db_host,
-        'db_port': system.db_port,
-        'db_name': system.db_name,
-        'db_username': system.db_username,
-        'db_password': system.db_password,
-        'connection_params': system.connection_params or {}
-    }
+    # Save user message concurrently with the AI call. Sessions are not
+    # task-safe, so the insert runs on its own session in the threadpool.
+    user_message_task = asyncio.create_task(run_in_threadpool(
+        _persist_user_message, session_id, current_user.id, message_data.message
+    ))
     
-    db_service = DatabaseService(db_config)
-    gemini_service = GeminiService()
+    # Initialize services
+    db_service = DatabaseService.from_system(system, http_client=request.app.state.bridge_client)
+    gemini_service = request.app.state.gemini
     
     # Process with universal approach - FIXED METHOD CALL
     try:
         ai_result = await gemini_service.process_universal_chat(  # ✅ Changed to process_universal_chat
             user_query=message_data.message,
-            db_service=db_service
+            db_service=db_service,
+            # Draft text reaches open WebSockets while it is generated
+            on_chunk=lambda text: manager.enqueue(current_user.id, {
+                "type": "ai_chunk",
+                "session_id": session_id,
+                "text": text
+            })
         )
         
         # Save AI response
@@ -190,7 +231,7 @@ async def send_chat_message(
             message=ai_result['response'],
             is_user=False,
             sql_query=ai_result.get('sql_query'),
-            query_result=json.dumps(ai_result.get('query_result')) if ai_result.get('query_result') else None
+            query_result=ai_result.get('query_result') or None
         )
         
     except Exception as e:
@@ -202,63 +243,42 @@ async def send_chat_message(
             is_user=False
         )
     
-    db.add(ai_message)
-    db.commit()
-    db.refresh(ai_message)
-    
-    # Update session
-    session.updated_at = datetime.utcnow()
-    db.commit()
+    await user_message_task
     
-    # WebSocket notification
-    await manager.send_personal_message(
-        json.dumps({
-            "type": "new_message",
-            "message": ai_message.message,
-            "is_user": False,
-            "session_id": session_id,
-            "created_at": ai_message.created_at.isoformat()
-        }),
-        current_user.id
-    )
+    await run_in_threadpool(_save_ai_message, db, ai_message)
+    response = ChatMessageResponseSchema.model_validate(ai_message)
     
-    # Prepare response
-    query_result = None
-    if ai_message.query_result:
-        try:
-            query_result = json.loads(ai_message.query_result)
-        except:
-            query_result = {"raw": ai_message.query_result}
+    # Session timestamp and WebSocket notification run after the response is sent
+    background.add_task(_touch_session, session_id)
+    background.add_task(_notify_new_message, current_user.id, {
+        "type": "new_message",
+        "message": ai_message.message,
+        "is_user": False,
+        "session_id": session_id,
+        "created_at": ai_message.created_at
+    })
     
-    return ChatMessageResponseSchema(
-        id=ai_message.id,
-        message=ai_message.message,
-        is_user=ai_message.is_user,
-        sql_query=ai_message.sql_query,
-        query_result=query_result,
-        created_at=ai_message.created_at
-    )
+    return response
 
 @router.delete("/sessions/{session_id}")
-async def delete_chat_session(
+def delete_chat_session(
     session_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete chat session"""
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
-    
-    if not session:
+    # Ownership check + delete in one statement
+    result = db.execute(
+        delete(ChatSession).where(
+            ChatSession.id == session_id,
+            ChatSession.user_id == current_user.id
+        )
+    )
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Session not found")
-    
-    # Delete messages
-    db.query(ChatMessage).filter(ChatMessage.session_id == session_id).delete()
-    
-    # Delete session
-    db.delete(session)
+    # The FK cascade only exists once migration 3f1c2a7d9b01 has run, so the
+    # messages are still deleted explicitly in the same transaction
+    db.execute(delete(ChatMessage).where(ChatMessage.session_id == session_id))
     db.commit()
     
     logger.info(f"User {current_user.id} deleted chat session: {session_id}")
@@ -1,17 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import lambda_stmt, select, update
+from sqlalchemy.orm import Session, undefer
 from app.database import get_db
 from app.models.user import User, UserSystem
-from app.schemas import SystemCreateSchema, SystemResponseSchema, SystemTestSchema
+from app.schemas import SystemConnectionSchema, SystemCreateSchema, SystemResponseSchema, SystemTestSchema, SystemUpdateSchema
 from app.dependencies import get_current_active_user
-from app.services.database_service import DatabaseService
+from app.services.database_service import DatabaseService, evict_system
+from app.utils.cache import TTLCache
+import hashlib
 import logging
+import orjson
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def _get_owned_system(db: Session, system_id: int, user_id: int, with_password: bool = False) -> UserSystem:
+    """Load a system owned by user_id or raise 404 (sync; async routes call it in the threadpool)"""
+    # lambda_stmt caches the constructed statement per code location; system_id and
+    # user_id become bound parameters, so each call skips building the select()
+    stmt = lambda_stmt(
+        lambda: select(UserSystem).where(UserSystem.id == system_id, UserSystem.user_id == user_id)
+    )
+    if with_password:
+        stmt += lambda s: s.options(undefer(UserSystem.db_password))
+    system = db.execute(stmt).scalar_one_or_none()
+    if system is None:
+        raise HTTPException(status_code=404, detail="System not found")
+    return system
+
+# Fields DatabaseService needs to reach a database, kept in one schema
+_CONNECTION_FIELDS = frozenset(SystemConnectionSchema.model_fields)
+
+# get_systems columns, in SystemResponseSchema order
+_SYSTEM_LIST_COLUMNS = tuple(
+    getattr(UserSystem, field) for field in SystemResponseSchema.model_fields
+)
+
+# Successful probes are reused briefly so repeated "Test" clicks don't re-dial
+_probe_cache = TTLCache(maxsize=1024, ttl=10)
+
+def _config_digest(db_config: dict) -> bytes:
+    """Cache key for an ad-hoc config; covers every field, including the password"""
+    return hashlib.sha256(orjson.dumps(db_config, option=orjson.OPT_SORT_KEYS)).digest()
+
+async def _probe(db_config: dict, http_client, cache_key=None, force: bool = False) -> dict:
+    """Test a connection config via BRIDGE; failures come back as success=False"""
+    if cache_key is not None and not force:
+        cached = _probe_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    try:
+        result = await DatabaseService(db_config, http_client=http_client).test_connection()
+    except Exception as e:
+        logger.error(f"Connection test error: {str(e)}")
+        return {"success": False, "message": str(e)}
+    if cache_key is not None and result.get("success"):
+        _probe_cache.set(cache_key, result)
+    return result
+
+def _save_system(db: Session, db_system: UserSystem):
+    """Persist a new system in one transaction (sync; called via the threadpool)"""
+    # id/created_at are filled in during flush (eager_defaults), no refresh needed
+    db.add(db_system)
+    db.commit()
+
+def _schema_ndjson(system_id: int, system_name: str, schema_result: dict):
+    """Encode a bridge schema result one table per line, so large schemas are
+    never serialized as a single document"""
+    tables = schema_result.get("schema")
+    if not isinstance(tables, dict):  # PHP encodes an empty schema as []
+        tables = {}
+    header = {k: v for k, v in schema_result.items() if k != "schema"}
+    yield orjson.dumps({"system_id": system_id, "system_name": system_name, **header}) + b"\n"
+    for table_name, table in tables.items():
+        yield orjson.dumps({"table": table_name, **table}) + b"\n"
+
 @router.post("/test-connection")
 async def test_system_connection(
+    request: Request,
     test_config: SystemTestSchema,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -24,20 +92,12 @@ async def test_system_connection(
         if not test_config.connection_params.get('bridge_api_key'):
             raise HTTPException(status_code=400, detail="bridge_api_key is required")
         
-        db_config = {
-            'system_type': test_config.system_type,
-            'db_host': test_config.db_host,
-            'db_port': test_config.db_port,
-            'db_name': test_config.db_name,
-            'db_username': test_config.db_username,
-            'db_password': test_config.db_password,
-            'connection_params': test_config.connection_params
-        }
-        
-        db_service = DatabaseService(db_config)
-        result = await db_service.test_connection()
-        
-        return result
+        db_config = test_config.model_dump(include=_CONNECTION_FIELDS)
+        return await _probe(
+            db_config,
+            request.app.state.bridge_client,
+            cache_key=_config_digest(db_config)
+        )
             
     except Exception as e:
         logger.error(f"Connection test error: {str(e)}")
@@ -45,6 +105,7 @@ async def test_system_connection(
 
 @router.post("/", response_model=SystemResponseSchema)
 async def create_system(
+    request: Request,
     system_data: SystemCreateSchema,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -58,125 +119,143 @@ async def create_system(
         raise HTTPException(status_code=400, detail="bridge_api_key is required in connection_params")
     
     # Test connection via bridge first
-    test_config = SystemTestSchema(
-        system_type=system_data.system_type,
-        db_host=system_data.db_host,
-        db_port=system_data.db_port,
-        db_name=system_data.db_name,
-        db_username=system_data.db_username,
-        db_password=system_data.db_password,
-        connection_params=system_data.connection_params
+    test_result = await _probe(
+        system_data.model_dump(include=_CONNECTION_FIELDS),
+        request.app.state.bridge_client
     )
-    
-    test_result = await test_system_connection(test_config, db, current_user)
     if not test_result.get('success'):
         raise HTTPException(
             status_code=400,
             detail=f"Bridge connection failed: {test_result.get('message')}"
         )
     
-    # Create system - bridge configuration is stored
+    # Create system - bridge configuration is stored in connection_params
     db_system = UserSystem(
+        **system_data.model_dump(),
         user_id=current_user.id,
-        system_name=system_data.system_name,
-        system_type=system_data.system_type,
-        db_host=system_data.db_host,
-        db_port=system_data.db_port,
-        db_name=system_data.db_name,
-        db_username=system_data.db_username,
-        db_password=system_data.db_password,
-        connection_params=system_data.connection_params,  # Bridge config stored here
         table_mappings={},
-        field_aliases={}, 
+        field_aliases={},
         business_rules={}
     )
     
-    db.add(db_system)
-    db.commit()
-    db.refresh(db_system)
+    await run_in_threadpool(_save_system, db, db_system)
     
     logger.info(f"User {current_user.id} created bridge-enabled system: {system_data.system_name}")
     return db_system
 
 @router.get("/", response_model=list[SystemResponseSchema])
-async def get_systems(
+def get_systems(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all systems for current user"""
-    systems = db.query(UserSystem).filter(
-        UserSystem.user_id == current_user.id,
-        UserSystem.is_active == True
-    ).all()
+    # Hot read path: select exactly the response columns as plain rows and let
+    # orjson encode them; no ORM hydration or pydantic pass per row
+    rows = db.execute(
+        select(*_SYSTEM_LIST_COLUMNS).where(
+            UserSystem.user_id == current_user.id,
+            UserSystem.is_active == True
+        )
+    ).mappings().all()
     
-    return systems
+    return ORJSONResponse([dict(row) for row in rows])
 
 @router.get("/{system_id}", response_model=SystemResponseSchema)
-async def get_system(
+def get_system(
     system_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get specific system"""
-    system = db.query(UserSystem).filter(
-        UserSystem.id == system_id,
-        UserSystem.user_id == current_user.id
-    ).first()
+    system = _get_owned_system(db, system_id, current_user.id)
     
-    if not system:
+    return system
+
+@router.put("/{system_id}")
+def update_system(
+    system_id: int,
+    system_data: SystemUpdateSchema,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Update system - only the fields that were sent, in a single UPDATE"""
+    values = system_data.model_dump(exclude_unset=True, exclude_none=True)
+    if not values:
+        # Same 404 as below for missing or soft-deleted systems
+        if not _get_owned_system(db, system_id, current_user.id).is_active:
+            raise HTTPException(status_code=404, detail="System not found")
+        return {"message": "System updated successfully"}
+    
+    # Soft-deleted systems can't be edited, matching delete_system
+    result = db.execute(
+        update(UserSystem)
+        .where(
+            UserSystem.id == system_id,
+            UserSystem.user_id == current_user.id,
+            UserSystem.is_active == True
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    # rowcount counts matched rows (SQLAlchemy enables FOUND_ROWS on MySQL)
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="System not found")
+    db.commit()
+    # Host, database or credentials may have changed: drops the cached service,
+    # schema and exploration (sampled rows) for this system
+    evict_system(current_user.id, system_id)
+    _probe_cache.pop(("system", system_id))
     
-    return system
+    logger.info(f"User {current_user.id} updated system: {system_id}")
+    return {"message": "System updated successfully"}
 
 @router.delete("/{system_id}")
-async def delete_system(
+def delete_system(
     system_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete system"""
-    system = db.query(UserSystem).filter(
-        UserSystem.id == system_id,
-        UserSystem.user_id == current_user.id
-    ).first()
-    
-    if not system:
+    # Soft delete in one statement; already-deleted systems report 404
+    result = db.execute(
+        update(UserSystem)
+        .where(
+            UserSystem.id == system_id,
+            UserSystem.user_id == current_user.id,
+            UserSystem.is_active == True
+        )
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="System not found")
-    
-    system.is_active = False
     db.commit()
+    evict_system(current_user.id, system_id)
+    _probe_cache.pop(("system", system_id))
     
-    logger.info(f"User {current_user.id} deleted system: {system.system_name}")
+    logger.info(f"User {current_user.id} deleted system: {system_id}")
     return {"message": "System deleted successfully"}
 
 @router.get("/{system_id}/schema")
 async def get_system_schema(
+    request: Request,
     system_id: int,
+    stream: bool = Query(False, description="Stream as NDJSON: a header line, then one line per table"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get database schema via BRIDGE"""
-    system = db.query(UserSystem).filter(
-        UserSystem.id == system_id,
-        UserSystem.user_id == current_user.id
-    ).first()
-    
-    if not system:
-        raise HTTPException(status_code=404, detail="System not found")
+    system = await run_in_threadpool(_get_owned_system, db, system_id, current_user.id, True)
     
-    db_config = {
-        'system_type': system.system_type,
-        'db_host': system.db_host,
-        'db_port': system.db_port,
-        'db_name': system.db_name,
-        'db_username': system.db_username,
-        'db_password': system.db_password,
-        'connection_params': system.connection_params or {}
-    }
-    
-    db_service = DatabaseService(db_config)
+    db_service = DatabaseService.from_system(system, http_client=request.app.state.bridge_client)
     schema_result = await db_service.get_table_schema()
     
+    if stream:
+        return StreamingResponse(
+            _schema_ndjson(system_id, system.system_name, schema_result),
+            media_type="application/x-ndjson"
+        )
+    
     return {
         "system_id": system_id,
         "system_name": system.system_name,
@@ -185,31 +264,22 @@ async def get_system_schema(
 
 @router.post("/{system_id}/test")
 async def test_existing_system(
+    request: Request,
     system_id: int,
+    force: bool = Query(False, description="Skip the short-lived result cache and probe again"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Test existing system connection via BRIDGE"""
-    system = db.query(UserSystem).filter(
-        UserSystem.id == system_id,
-        UserSystem.user_id == current_user.id
-    ).first()
-    
-    if not system:
-        raise HTTPException(status_code=404, detail="System not found")
+    system = await run_in_threadpool(_get_owned_system, db, system_id, current_user.id, True)
     
-    db_config = {
-        'system_type': system.system_type,
-        'db_host': system.db_host,
-        'db_port': system.db_port,
-        'db_name': system.db_name,
-        'db_username': system.db_username,
-        'db_password': system.db_password,
-        'connection_params': system.connection_params or {}
-    }
-    
-    db_service = DatabaseService(db_config)
-    result = await db_service.test_connection()
+    cache_key = ("system", system_id)
+    result = None if force else _probe_cache.get(cache_key)
+    if result is None:
+        db_service = DatabaseService.from_system(system, http_client=request.app.state.bridge_client)
+        result = await db_service.test_connection()
+        if result.get("success"):
+            _probe_cache.set(cache_key, result)
     
     return {
         "system_id": system_id,
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from typing import List, Optional
 from app.database import get_db
 from app.models.user import User
 from app.schemas import UserResponseSchema
-from app.routes.auth import get_current_active_user  # ✅ Import dari auth.py
+from app.dependencies import get_current_active_user
 
 router = APIRouter()
 
+# Validate + dump the whole listing in one pydantic-core pass
+_users_adapter = TypeAdapter(List[UserResponseSchema])
+
 @router.get("/", response_model=list[UserResponseSchema])
-async def get_all_users(
+def get_all_users(
+    cursor: Optional[int] = Query(None, description="Return users with id above this cursor (X-Next-Cursor of the previous page)"),
+    limit: int = Query(100, ge=1, le=500, description="Number of users to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -16,11 +25,20 @@ async def get_all_users(
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    users = db.query(User).all()
-    return users
+    # Keyset page over the primary key: cost stays flat however deep the cursor is
+    stmt = select(User)
+    if cursor is not None:
+        stmt = stmt.where(User.id > cursor)
+    users = db.execute(stmt.order_by(User.id).limit(limit)).scalars().all()
+    
+    validated = _users_adapter.validate_python(users, from_attributes=True)
+    response = ORJSONResponse(_users_adapter.dump_python(validated, mode="json"))
+    if len(users) == limit:
+        response.headers["X-Next-Cursor"] = str(users[-1].id)
+    return response
 
 @router.get("/{user_id}", response_model=UserResponseSchema)
-async def get_user(
+def get_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -29,7 +47,7 @@ async def get_user(
     if not current_user.is_admin and current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -2,6 +2,37 @@ from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional, List, Any, Dict
 from datetime import datetime
 
+__all__ = [
+    "UserBaseSchema",
+    "UserCreateSchema",
+    "UserLoginSchema",
+    "UserResponseSchema",
+    "TokenSchema",
+    "TokenDataSchema",
+    "SystemBaseSchema",
+    "SystemCreateSchema",
+    "SystemUpdateSchema",
+    "SystemResponseSchema",
+    "SystemTestSchema",
+    "SystemConnectionSchema",
+    "ChatMessageBaseSchema",
+    "ChatMessageCreateSchema",
+    "ChatMessageResponseSchema",
+    "ChatSessionBaseSchema",
+    "ChatSessionCreateSchema",
+    "ChatSessionResponseSchema",
+    "ChatWithSystemSchema",
+    "UserAdminSchema",
+    "UserCreateAdminSchema",
+    "UserUpdateAdminSchema",
+    "AdminStatsSchema",
+    "SystemAdminSchema",
+    "AdminChatUserSchema",
+    "RecentChatItemSchema",
+    "AdminSessionSystemSchema",
+    "AdminSessionItemSchema",
+]
+
 # ===============================
 # USER SCHEMAS
 # ===============================
@@ -100,6 +131,27 @@ class SystemCreateSchema(SystemBaseSchema):
             }
         }
 
+class SystemUpdateSchema(BaseModel):
+    system_name: Optional[str] = None
+    system_type: Optional[str] = None
+    db_host: Optional[str] = None
+    db_port: Optional[int] = None
+    db_name: Optional[str] = None
+    db_username: Optional[str] = None
+    db_password: Optional[str] = None
+    connection_params: Optional[Dict] = None
+
+    @field_validator('connection_params')
+    @classmethod
+    def validate_bridge_config(cls, v):
+        if v is None:
+            return v
+        if not v.get('bridge_url'):
+            raise ValueError('bridge_url is required in connection_params')
+        if not v.get('bridge_api_key'):
+            raise ValueError('bridge_api_key is required in connection_params')
+        return v
+
 class SystemResponseSchema(SystemBaseSchema):
     id: int
     user_id: int
@@ -135,6 +187,24 @@ class SystemTestSchema(BaseModel):
             }
         }
 
+class SystemConnectionSchema(BaseModel):
+    """Connection fields DatabaseService needs (db_config), read from a UserSystem row"""
+    system_type: str
+    db_host: str
+    db_port: int
+    db_name: str
+    db_username: str
+    db_password: str
+    connection_params: Dict = {}
+
+    @field_validator('connection_params', mode='before')
+    @classmethod
+    def default_connection_params(cls, v):
+        return v or {}
+
+    class Config:
+        from_attributes = True
+
 
 # ===============================
 # CHAT SCHEMAS
@@ -251,3 +321,35 @@ class SystemAdminSchema(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class AdminChatUserSchema(BaseModel):
+    id: int
+    username: str
+    email: str
+
+
+class RecentChatItemSchema(BaseModel):
+    id: int
+    user: AdminChatUserSchema
+    session_id: int
+    session_name: Optional[str] = None
+    message: str
+    is_user: bool
+    sql_query: Optional[str] = None
+    created_at: datetime
+
+
+class AdminSessionSystemSchema(BaseModel):
+    id: Optional[int] = None
+    name: Optional[str] = None
+
+
+class AdminSessionItemSchema(BaseModel):
+    id: int
+    user: AdminChatUserSchema
+    session_name: Optional[str] = None
+    system: AdminSessionSystemSchema
+    message_count: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
@@ -1,9 +1,4 @@
-from pydantic import BaseModel
+# Legacy names; the schemas themselves live in app.schemas
+from app.schemas import AdminStatsSchema as AdminStats
 
-class AdminStats(BaseModel):
-    total_users: int
-    total_systems: int
-    total_chat_sessions: int
-    total_messages: int
-    active_users_today: int
-    new_users_this_week: int
\ No newline at end of file
+__all__ = ["AdminStats"]
@@ -1,9 +1,4 @@
-from pydantic import BaseModel
-from typing import Optional
+# Legacy names; the schemas themselves live in app.schemas
+from app.schemas import TokenSchema as Token, TokenDataSchema as TokenData
 
-class Token(BaseModel):
-    access_token: str
-    token_type: str
-
-class TokenData(BaseModel):
-    username: Optional[str] = None
\ No newline at end of file
+__all__ = ["Token", "TokenData"]
@@ -1,44 +1,15 @@
-from pydantic import BaseModel
-from typing import Optional, Dict
-from datetime import datetime
-
-class ChatMessageBase(BaseModel):
-    message: str
-    session_id: Optional[int] = None
-    system_id: Optional[int] = None
-
-class ChatMessageCreate(ChatMessageBase):
-    pass
-
-class ChatMessageResponse(BaseModel):
-    id: int
-    message: str
-    is_user: bool
-    sql_query: Optional[str] = None
-    query_result: Optional[Dict] = None
-    created_at: datetime
-
-    class Config:
-        from_attributes = True
-
-class ChatSessionBase(BaseModel):
-    session_name: str
-    system_id: Optional[int] = None
-
-class ChatSessionCreate(ChatSessionBase):
-    pass
-
-class ChatSession(ChatSessionBase):
-    id: int
-    user_id: int
-    created_at: datetime
-    updated_at: Optional[datetime] = None
-
-    class Config:
-        from_attributes = True
-
-class ChatWithSystem(ChatSession):
-    system_name: Optional[str] = None
-
-    class Config:
-        from_attributes = True
\ No newline at end of file
+# Legacy names; the schemas themselves live in app.schemas
+from app.schemas import (
+    ChatMessageBaseSchema as ChatMessageBase,
+    ChatMessageCreateSchema as ChatMessageCreate,
+    ChatMessageResponseSchema as ChatMessageResponse,
+    ChatSessionBaseSchema as ChatSessionBase,
+    ChatSessionCreateSchema as ChatSessionCreate,
+    ChatSessionResponseSchema as ChatSession,
+    ChatWithSystemSchema as ChatWithSystem,
+)
+
+__all__ = [
+    "ChatMessageBase", "ChatMessageCreate", "ChatMessageResponse",
+    "ChatSessionBase", "ChatSessionCreate", "ChatSession", "ChatWithSystem",
+]
@@ -1,53 +1,12 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
-from datetime import datetime
-
-class UserBase(BaseModel):
-    email: EmailStr
-    username: str
-    full_name: Optional[str] = None
-    is_active: bool = True
-
-class UserCreate(UserBase):
-    password: str
-
-class UserLogin(BaseModel):
-    username: str
-    password: str
-
-class User(UserBase):
-    id: int
-    created_at: datetime
-    updated_at: Optional[datetime] = None
-
-    class Config:
-        from_attributes = True
-
-# Admin Schemas
-class UserAdmin(BaseModel):
-    id: int
-    email: EmailStr
-    username: str
-    full_name: Optional[str] = None
-    is_active: bool
-    is_admin: bool
-    is_superadmin: bool
-    last_login: Optional[datetime] = None
-    login_count: int
-    created_at: datetime
-    updated_at: Optional[datetime] = None
-
-    class Config:
-        from_attributes = True
-
-class UserCreateAdmin(UserCreate):
-    is_admin: bool = False
-    is_superadmin: bool = False
-
-class UserUpdateAdmin(BaseModel):
-    email: Optional[EmailStr] = None
-    username: Optional[str] = None
-    full_name: Optional[str] = None
-    is_active: Optional[bool] = None
-    is_admin: Optional[bool] = None
-    is_superadmin: Optional[bool] = None
\ No newline at end of file
+# Legacy names; the schemas themselves live in app.schemas
+from app.schemas import (
+    UserBaseSchema as UserBase,
+    UserCreateSchema as UserCreate,
+    UserLoginSchema as UserLogin,
+    UserResponseSchema as User,
+    UserAdminSchema as UserAdmin,
+    UserCreateAdminSchema as UserCreateAdmin,
+    UserUpdateAdminSchema as UserUpdateAdmin,
+)
+
+__all__ = ["UserBase", "UserCreate", "UserLogin", "User", "UserAdmin", "UserCreateAdmin", "UserUpdateAdmin"]
@@ -1,15 +1,141 @@
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, Optional
+import random
+import time
+from typing import Dict, Any, Hashable, List, Optional, Set, Tuple
 import httpx
+import orjson
+from app.schemas import SystemConnectionSchema
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Schemas change rarely. A cached schema is served as-is for SCHEMA_FRESH_SECONDS;
+# after that (up to the cache TTL) it is revalidated with the cheap bridge "test"
+# action, whose table_count must still match, before a full "schema" call.
+SCHEMA_FRESH_SECONDS = 300
+_schema_cache = TTLCache(maxsize=1024, ttl=900)
+_schema_locks: Dict[Hashable, asyncio.Lock] = {}
+
+# Exploration (schema + sample rows) per system, reused across chat turns. Kept
+# here next to the schema cache so editing or deleting a system drops both.
+exploration_cache = TTLCache(maxsize=512, ttl=600)
+# Explorations in flight per key. Invalidation drops the entry, and a run whose
+# entry is gone doesn't cache its (possibly stale) result.
+exploration_inflight: Dict[Hashable, asyncio.Task] = {}
+
+# system id -> (updated_at, DatabaseService); instances hold no per-call state, so
+# they are shared. updated_at versions the entry, so an edit made through another
+# worker process is picked up on the next lookup instead of after the TTL.
+_service_cache = TTLCache(maxsize=1024, ttl=300)
+
+# One pooled client per process: bridge calls reuse keep-alive (and HTTP/2)
+# connections instead of paying DNS + TCP + TLS setup on every request
+_bridge_client: Optional[httpx.AsyncClient] = None
+
+def get_bridge_client() -> httpx.AsyncClient:
+    """Shared HTTP client for bridge calls, created on first use"""
+    global _bridge_client
+    if _bridge_client is None or _bridge_client.is_closed:
+        _bridge_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            # retries=1 re-dials once when a pooled connection fails to connect
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=1,
+                limits=httpx.Limits(max_connections=200, max_keepalive_connections=100)
+            )
+        )
+    return _bridge_client
+
+# Transient failures worth another attempt. test and schema are read-only;
+# execute/execute_batch are only repeated when every query is a SELECT, since
+# the bridge enforces its own policy and a custom one may accept writes.
+# Read timeouts are not retried: that attempt already used the whole timeout.
+BRIDGE_RETRIES = 2
+_IDEMPOTENT_ACTIONS = frozenset({"test", "schema"})
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+_RETRYABLE_STATUSES = frozenset({502, 503, 504})
+
+# Bridge URLs used recently; the keepalive loop pings these so their pooled
+# connections aren't idled out by the bridge host or a load balancer
+BRIDGE_KEEPALIVE_SECONDS = 30
+_recent_bridges = TTLCache(maxsize=256, ttl=300)
+
+async def warm_bridge_connections(bridge_urls):
+    """Open pooled connections to the given bridges ahead of the first real call.
+
+    Pinging doesn't count as use: only real bridge calls keep a URL in
+    _recent_bridges, so unused bridges age out of the keepalive loop.
+    """
+    client = get_bridge_client()
+    
+    async def _ping(url: str):
+        try:
+            # Any response will do; the point is the established TCP/TLS connection
+            await client.head(url, timeout=5)
+        except Exception as e:  # also e.g. InvalidURL from a bad stored URL
+            logger.debug("Bridge warm-up failed for %s: %s", url, e)
+    
+    await asyncio.gather(*(_ping(url) for url in set(bridge_urls)))
+
+async def keep_bridges_warm():
+    """Background loop: re-ping recently used bridges every BRIDGE_KEEPALIVE_SECONDS"""
+    while True:
+        await asyncio.sleep(BRIDGE_KEEPALIVE_SECONDS)
+        try:
+            await warm_bridge_connections(_recent_bridges.keys())
+        except Exception as e:
+            # One bad pass must not end the loop for the life of the process
+            logger.warning("Bridge keepalive pass failed: %s", e)
+
+async def close_bridge_client():
+    """Close the shared client; called on application shutdown"""
+    global _bridge_client
+    if _bridge_client is not None:
+        await _bridge_client.aclose()
+        _bridge_client = None
+
+def invalidate_schema_cache(cache_key: Hashable):
+    """Drop the cached schema and exploration for a system, e.g. after it was changed or removed"""
+    _schema_cache.pop(cache_key)
+    _schema_locks.pop(cache_key, None)
+    exploration_cache.pop(cache_key)
+    exploration_inflight.pop(cache_key, None)
+
+def evict_system(user_id: int, system_id: int):
+    """Forget the cached service, schema and exploration for a system that was changed or removed"""
+    _service_cache.pop(system_id)
+    invalidate_schema_cache((user_id, system_id))
+
+# Same whitespace set PHP's trim() strips before the example bridge's SELECT check
+_LEADING_WHITESPACE = " \t\r\n\0\x0b"
+
+def is_select(query: str) -> bool:
+    """Whether a query is a plain SELECT, i.e. safe to send again, without copying it"""
+    i, n = 0, len(query)
+    while i < n and query[i] in _LEADING_WHITESPACE:
+        i += 1
+    return query[i:i + 6].upper() == "SELECT"
+
 class DatabaseService:
-    def __init__(self, db_config: Dict):
+    def __init__(
+        self,
+        db_config: Dict,
+        http_client: Optional[httpx.AsyncClient] = None,
+        schema_cache_key: Optional[Hashable] = None
+    ):
         """
         Bridge-first database service - always use bridge to avoid firewall issues
+
+        ``http_client`` defaults to the process-wide pooled bridge client. With a
+        ``schema_cache_key`` (e.g. ``(user_id, system_id)``) schema lookups are cached.
         """
         self.db_config = db_config or {}
+        self._http_client = http_client
+        self._schema_cache_key = schema_cache_key
+        self._batcher: Optional["_BridgeBatcher"] = None
         self.connection = None
         self._conn_params = self.db_config.get("connection_params") or {}
         
@@ -25,9 +151,67 @@ class DatabaseService:
         )
         
         self._system_type = (self.db_config.get("system_type") or "mysql").lower()
+        
+        # Connection fields sent with every bridge action, built once per service
+        self._base_payload = {
+            "system_type": self._system_type,
+            "db_host": self.db_config.get("db_host"),
+            "db_port": int(self.db_config.get("db_port") or 3306),
+            "db_name": self.db_config.get("db_name"),
+            "db_username": self.db_config.get("db_username"),
+            "db_password": self.db_config.get("db_password"),
+            "connection_params": self._conn_params
+        }
 
-    async def _call_bridge(self, action: str, payload: Optional[Dict[str, Any]] = None, timeout: int = 30) -> Dict[str, Any]:
-        """Call bridge API - this is the PRIMARY method"""
+    def exploration_key(self) -> Hashable:
+        """Cache identity for this service's data: the (user_id, system_id) schema key
+        when there is one, else a digest of the full connection config, credentials
+        included, so different logins to the same database never share an entry."""
+        if self._schema_cache_key is not None:
+            return self._schema_cache_key
+        config = orjson.dumps(
+            {**self._base_payload, "bridge_url": self._bridge_url, "bridge_key": self._bridge_key},
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )
+        return ("config", hashlib.blake2b(config, digest_size=16).hexdigest())
+
+    @staticmethod
+    def config_from_system(system) -> Dict[str, Any]:
+        """Build the db_config dict for a UserSystem row"""
+        return SystemConnectionSchema.model_validate(system).model_dump()
+
+    @classmethod
+    def from_system(cls, system, http_client: Optional[httpx.AsyncClient] = None) -> "DatabaseService":
+        """Get the (cached) service for a UserSystem, with schema caching enabled"""
+        cached = _service_cache.get(system.id)
+        if cached is not None:
+            version, service = cached
+            if version == system.updated_at and service._http_client is http_client:
+                return service
+            if version != system.updated_at:
+                # Connection settings changed since the schema was cached
+                invalidate_schema_cache((system.user_id, system.id))
+        
+        service = cls(
+            cls.config_from_system(system),
+            http_client=http_client,
+            schema_cache_key=(system.user_id, system.id)
+        )
+        _service_cache.set(system.id, (system.updated_at, service))
+        return service
+
+    async def _call_bridge(
+        self,
+        action: str,
+        payload: Optional[Dict[str, Any]] = None,
+        timeout: int = 30,
+        idempotent: bool = False
+    ) -> Dict[str, Any]:
+        """Call bridge API - this is the PRIMARY method
+
+        Transient failures are retried for read-only actions, or when the caller
+        marks the call ``idempotent``.
+        """
         if not self._bridge_url:
             return {"success": False, "message": "Bridge URL not configured"}
 
@@ -41,97 +225,205 @@ class DatabaseService:
         if self._bridge_key:
             headers["X-API-Key"] = self._bridge_key
 
+        _recent_bridges.set(self._bridge_url, True)
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                logger.info(f"Calling bridge: {url}")
-                resp = await client.post(url, json=payload or {}, headers=headers)
-                
-                if resp.status_code != 200:
-                    return {
-                        "success": False, 
-                        "message": f"Bridge returned status {resp.status_code}: {resp.text}"
-                    }
-                
+            logger.info("Calling bridge: %s", url)
+            client = self._http_client or get_bridge_client()
+            body = orjson.dumps(payload or {})
+            attempts = BRIDGE_RETRIES + 1 if idempotent or action in _IDEMPOTENT_ACTIONS else 1
+            for attempt in range(attempts):
+                last_attempt = attempt == attempts - 1
                 try:
-                    result = resp.json()
-                    logger.info(f"Bridge response: {result.get('success', False)}")
-                    return result
-                except Exception as e:
-                    return {
-                        "success": False, 
-                        "message": f"Bridge returned invalid JSON: {resp.text}"
-                    }
+                    resp = await client.post(url, content=body, headers=headers, timeout=timeout)
+                except _RETRYABLE_ERRORS:
+                    if last_attempt:
+                        raise
+                else:
+                    if resp.status_code not in _RETRYABLE_STATUSES or last_attempt:
+                        break
+                if attempt == 0:
+                    logger.warning("Bridge %s call failed, retrying", action)
+                # Jittered exponential backoff so callers don't retry in lockstep
+                await asyncio.sleep(0.05 * 2 ** attempt + random.random() * 0.05)
+            
+            if resp.status_code != 200:
+                return {
+                    "success": False, 
+                    "message": f"Bridge returned status {resp.status_code}: {resp.text}"
+                }
+            
+            try:
+                # Parse the raw bytes in C; skips decoding the body to a str first
+                result = orjson.loads(resp.content)
+                logger.info("Bridge response: %s", result.get('success', False))
+                return result
+            except Exception as e:
+                return {
+                    "success": False, 
+                    "message": f"Bridge returned invalid JSON: {resp.text}"
+                }
                     
         except httpx.ConnectError:
             return {"success": False, "message": "Cannot connect to bridge server"}
         except httpx.TimeoutException:
             return {"success": False, "message": "Bridge request timeout"}
         except Exception as e:
-            logger.error(f"Bridge call error: {str(e)}")
+            logger.error("Bridge call error: %s", e)
             return {"success": False, "message": f"Bridge error: {str(e)}"}
 
-    async def connect(self) -> bool:
-        """Bridge-first - always return True since we use bridge"""
-        return True
-
-    async def disconnect(self):
-        """No need to disconnect with bridge"""
-        pass
-
     async def test_connection(self) -> Dict[str, Any]:
         """
         Test connection via BRIDGE only
         """
-        bridge_payload = {
-            "system_type": self._system_type,
-            "db_host": self.db_config.get("db_host"),
-            "db_port": int(self.db_config.get("db_port", 3306)),
-            "db_name": self.db_config.get("db_name"),
-            "db_username": self.db_config.get("db_username"),
-            "db_password": self.db_config.get("db_password"),
-            "connection_params": self._conn_params
-        }
-        
-        logger.info(f"Testing connection via bridge: {self._bridge_url}")
-        result = await self._call_bridge("test", bridge_payload, timeout=20)
+        logger.info("Testing connection via bridge: %s", self._bridge_url)
+        result = await self._call_bridge("test", self._base_payload, timeout=20)
         result["method"] = "bridge"
         return result
 
     async def get_table_schema(self) -> Dict[str, Any]:
         """
-        Get schema via BRIDGE only
+        Get schema via BRIDGE only, served from the per-system cache when possible
         """
-        bridge_payload = {
-            "system_type": self._system_type,
-            "db_host": self.db_config.get("db_host"),
-            "db_port": int(self.db_config.get("db_port", 3306)),
-            "db_name": self.db_config.get("db_name"),
-            "db_username": self.db_config.get("db_username"),
-            "db_password": self.db_config.get("db_password"),
-            "connection_params": self._conn_params
-        }
+        key = self._schema_cache_key
+        if key is None:
+            return await self._fetch_table_schema()
         
-        logger.info(f"Getting schema via bridge: {self._bridge_url}")
-        result = await self._call_bridge("schema", bridge_payload, timeout=60)
+        cached = _schema_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < SCHEMA_FRESH_SECONDS:
+            return cached[1]
+        
+        # One bridge call per system even when many requests miss at once
+        async with _schema_locks.setdefault(key, asyncio.Lock()):
+            cached = _schema_cache.get(key)
+            if cached is not None:
+                fetched_at, result = cached
+                if time.monotonic() - fetched_at < SCHEMA_FRESH_SECONDS:
+                    return result
+                if await self._schema_unchanged(result):
+                    _schema_cache.set(key, (time.monotonic(), result))
+                    return result
+            result = await self._fetch_table_schema()
+            if result.get("success"):
+                _schema_cache.set(key, (time.monotonic(), result))
+            return result
+
+    async def _schema_unchanged(self, cached_result: Dict[str, Any]) -> bool:
+        """Cheap revalidation against the bridge "test" action.
+
+        Compares the column fingerprint (schema_version) when both sides have
+        one; bridges that predate it fall back to comparing the table count.
+        """
+        probe = await self.test_connection()
+        if not probe.get("success"):
+            return False
+        try:
+            version = probe["data"].get("schema_version")
+            if version is not None and cached_result.get("schema_version") is not None:
+                return version == cached_result["schema_version"]
+            return int(probe["data"]["table_count"]) == int(cached_result["table_count"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return False
+
+    async def _fetch_table_schema(self) -> Dict[str, Any]:
+        """Call the bridge schema action"""
+        logger.info("Getting schema via bridge: %s", self._bridge_url)
+        result = await self._call_bridge("schema", self._base_payload, timeout=60)
         result["method"] = "bridge"
         return result
 
     async def execute_query(self, query: str) -> Dict[str, Any]:
         """
-        Execute query via BRIDGE only
+        Execute query via BRIDGE only; concurrent calls share one execute_batch POST
         """
-        bridge_payload = {
-            "system_type": self._system_type,
-            "db_host": self.db_config.get("db_host"),
-            "db_port": int(self.db_config.get("db_port", 3306)),
-            "db_name": self.db_config.get("db_name"),
-            "db_username": self.db_config.get("db_username"),
-            "db_password": self.db_config.get("db_password"),
-            "query": query,
-            "connection_params": self._conn_params
-        }
+        if self._batcher is None:
+            self._batcher = _BridgeBatcher(self)
+        return await self._batcher.submit(query)
+
+    async def execute_batch(self, queries: List[str]) -> Dict[str, Any]:
+        """Run several queries in one bridge round trip (bridge action execute_batch)"""
+        bridge_payload = {**self._base_payload, "queries": queries}
         
-        logger.info(f"Executing query via bridge: {query[:100]}...")
-        result = await self._call_bridge("execute", bridge_payload, timeout=60)
+        logger.info("Executing %d queries via bridge batch", len(queries))
+        return await self._call_bridge(
+            "execute_batch", bridge_payload, timeout=60,
+            idempotent=all(is_select(query) for query in queries)
+        )
+
+    async def _execute_single(self, query: str) -> Dict[str, Any]:
+        """Call the bridge execute action for one query"""
+        bridge_payload = {**self._base_payload, "query": query}
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Executing query via bridge: %s...", query[:100])
+        result = await self._call_bridge("execute", bridge_payload, timeout=60, idempotent=is_select(query))
         result["method"] = "bridge"
-        return result
\ No newline at end of file
+        return result
+
+class _BridgeBatcher:
+    """Coalesces concurrent execute_query calls on one service into execute_batch POSTs.
+
+    Queries submitted within BATCH_WINDOW_SECONDS of each other (up to MAX_BATCH)
+    go out together; each caller gets its own result back. Bridges without the
+    execute_batch action are detected once and then served query by query.
+    """
+
+    BATCH_WINDOW_SECONDS = 0.002
+    MAX_BATCH = 32
+
+    def __init__(self, service: DatabaseService):
+        self._service = service
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # Full batches sent right away; referenced until done so they aren't
+        # garbage-collected mid-flight with callers still awaiting their futures
+        self._running: Set[asyncio.Task] = set()
+        self._supported = True
+
+    async def submit(self, query: str) -> Dict[str, Any]:
+        if not self._supported:
+            return await self._service._execute_single(query)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((query, future))
+        if len(self._pending) >= self.MAX_BATCH:
+            batch, self._pending = self._pending, []
+            task = asyncio.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.BATCH_WINDOW_SECONDS)
+        finally:
+            self._flush_task = None
+        batch, self._pending = self._pending, []
+        if batch:
+            await self._run(batch)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            if len(batch) == 1:
+                results = [await self._service._execute_single(batch[0][0])]
+            else:
+                response = await self._service.execute_batch([query for query, _ in batch])
+                results = response.get("results")
+                if not isinstance(results, list) or len(results) != len(batch):
+                    if response.get("error") == "Invalid action":
+                        # Older bridge: remember and fall back to one call per query
+                        self._supported = False
+                        results = await asyncio.gather(
+                            *(self._service._execute_single(query) for query, _ in batch)
+                        )
+                    else:
+                        results = [dict(response) for _ in batch]
+            for (_, future), result in zip(batch, results):
+                result["method"] = "bridge"
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
@@ -1,22 +1,240 @@
 import google.generativeai as genai
 from app.config import settings
-from app.services.database_service import DatabaseService
-import json
+from app.services.database_service import DatabaseService, exploration_cache, exploration_inflight, is_select
+from app.utils.cache import TTLCache
+import asyncio
+import hashlib
+import orjson
 import re
 import logging
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Hashable, Optional, Union
 
 logger = logging.getLogger(__name__)
 
-class GeminiService:
-    def __init__(self):
+# Max concurrent sample queries per exploration, so large schemas don't flood the bridge
+SAMPLE_CONCURRENCY = 10
+
+# Max Gemini generations in flight per process; excess turns queue instead of
+# piling up against the API quota
+GEMINI_CONCURRENCY = 10
+_generation_slots = asyncio.Semaphore(GEMINI_CONCURRENCY)
+
+# SQL extraction pattern, compiled once. It uses [^\]]* so the scan stays
+# linear instead of backtracking on long responses; fenced blocks are found
+# with plain str.find (see _extract_sql_query).
+_SQL_FENCE_OPEN = "```sql"
+_SQL_FENCE_CLOSE = "```"
+_SQL_BRACKET_RE = re.compile(r'\[SQL:\s*([^\]\n]*)\]')
+
+# Pretty-printed JSON for prompt blocks; orjson emits UTF-8 like ensure_ascii=False did
+_PROMPT_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+def _prompt_json(value: Any) -> str:
+    return orjson.dumps(value, option=_PROMPT_JSON_OPTIONS).decode()
+
+# Byte budget for the sampled database content embedded in each prompt, and
+# how many tables it may describe when the question points at specific ones
+PROMPT_CONTENT_MAX_BYTES = 8000
+PROMPT_MAX_TABLES = 15
+
+# Serialized prompt content per exploration digest, when nothing had to be cut
+_content_json_cache = TTLCache(maxsize=64, ttl=600)
+
+_WORD_RE = re.compile(r'\w+')
+
+def _compact_db_content(
+    db_content: Dict[str, Any],
+    user_query: str = "",
+    max_bytes: int = PROMPT_CONTENT_MAX_BYTES,
+    max_tables: int = PROMPT_MAX_TABLES
+) -> Dict[str, Any]:
+    """Keep every table's columns, but only as many sample rows as fit in max_bytes.
+
+    Tables whose name or columns appear in the user query are filled first,
+    so the rows that survive truncation are the ones most likely to matter.
+    Schemas with more than max_tables tables are cut to the max_tables most
+    relevant ones, unless the query matches none of them. The output keeps
+    the exploration's table order, so the block is byte-identical across
+    questions whenever nothing had to be cut.
+    """
+    words = set(_WORD_RE.findall(user_query.lower()))
+    scores = {
+        name: len(words & {name.lower(), *(str(column).lower() for column in info.get('columns', []))})
+        for name, info in db_content.items()
+    }
+    ordered = sorted(db_content.items(), key=lambda item: -scores[item[0]])
+    if len(ordered) > max_tables and scores[ordered[0][0]] > 0:
+        # Unmatched tables are still named in the database context line
+        ordered = ordered[:max_tables]
+        kept_tables = {name for name, _ in ordered}
+        db_content = {name: info for name, info in db_content.items() if name in kept_tables}
+    
+    compact = {
+        name: {'columns': info.get('columns', []), 'sample_data': [], 'sample_size': info.get('sample_size', 0)}
+        for name, info in db_content.items()
+    }
+    used = len(orjson.dumps(compact, option=orjson.OPT_NON_STR_KEYS))
+    
+    for name, info in ordered:
+        rows = info.get('sample_data', [])
+        kept = compact[name]['sample_data']
+        for row in rows:
+            size = len(orjson.dumps(row, option=orjson.OPT_NON_STR_KEYS)) + 1
+            if used + size > max_bytes:
+                break
+            kept.append(row)
+            used += size
+        if len(kept) < len(rows):
+            compact[name]['_truncated'] = len(rows) - len(kept)
+    
+    return compact
+
+# Static instruction block of the chat prompt, built once; each turn only appends
+# the database context and the question. Invariant text goes first so the
+# prompt shares the longest possible prefix across turns.
+_ADAPTIVE_PROMPT_PREFIX = """Anda adalah asisten AI yang sangat fleksibel dan adaptif. User dapat bertanya APA SAJA, dan Anda harus merespons dengan cara yang paling membantu berdasarkan database yang tersedia.
+
+INSTRUKSI FLEKSIBEL:
+1. PERTIMBANGAN AWAL: Pahami intent user - apakah mereka butuh data, penjelasan, bantuan teknis, atau sesuatu yang lain?
+2. ADAPTASI: Sesuaikan respons Anda dengan apa yang tersedia di database
+3. JIKA RELEVAN: Sarankan query SQL yang berguna (jika ada data yang sesuai)
+4. JIKA TIDAK RELEVAN: Berikan respons umum yang membantu tanpa data
+5. JIKA TIDAK PAHAM: Akui dengan jujur dan tawarkan bantuan alternatif
+6. SELALU: Bersikap helpful, informatif, dan natural
+
+JENIS PERTANYAAN & CONTOH RESPONS:
+
+PERTANYAAN TENTANG DATA:
+User: "berapa total penjualan?"
+AI: "Saya akan cek data penjualan Anda. [SQL: SELECT COUNT(*) FROM sales]"
+"Berdasarkan data, total penjualan adalah 150 transaksi."
+
+PERTANYAAN TENTANG STRUKTUR:
+User: "tabel apa saja yang ada?"
+AI: "Database Anda memiliki 3 tabel: products, customers, orders. Mau lihat data dari tabel mana?"
+
+PERTANYAAN BISNIS:
+User: "bagaimana performa bisnis?"
+AI: "Saya analisis data Anda. [SQL terkait] Berdasarkan data, revenue bulan ini Rp 50jt dengan 100 transaksi."
+
+PERTANYAAN TEKNIS:
+User: "cara query data customer?"
+AI: "Untuk melihat data customer, gunakan: SELECT * FROM customers LIMIT 10"
+
+PERTANYAAN UMUM:
+User: "halo"
+AI: "Halo! Saya siap membantu analisis database Anda. Ada yang bisa saya bantu?"
+
+PERTANYAAN TIDAK RELEVAN:
+User: "cuaca hari ini bagaimana?"
+AI: "Saya fokus membantu analisis database Anda. Untuk cuaca, mungkin butuh sumber lain. Ada yang bisa saya bantu terkait data Anda?"
+
+FORMAT RESPONS:
+- Natural conversation
+- Jelaskan apa yang Anda lakukan
+- Sertakan data jika ada
+- Tawarkan bantuan lanjutan
+- Jangan buat user bingung
+
+"""
+
+# Task for the follow-up call that folds query rows into the first reply
+_ENHANCE_PROMPT_PREFIX = """Tugas: Perbaiki respons AI dengan menyertakan data aktual yang didapat.
+Buat respons yang lebih informatif dan akurat berdasarkan data nyata.
+Pertahankan gaya conversational yang natural.
+
+"""
+
+# Exact-match cache of Gemini replies. Keys digest everything the prompt is
+# built from, so a hit means the model would have seen the same input.
+ADAPTIVE_RESPONSE_TTL = 3600
+ENHANCED_RESPONSE_TTL = 600
+_response_cache = TTLCache(maxsize=2048, ttl=ENHANCED_RESPONSE_TTL)
+
+def _digest(*parts: Union[str, bytes]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode() if isinstance(part, str) else part)
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _response_key(template: str, user_query: str, *context: Union[str, bytes]) -> str:
+    """Cache key for one prompt template; spacing of the question is ignored, case is not (literals are case-sensitive)"""
+    return _digest(template, " ".join(user_query.split()), *context)
+
+def _forget_inflight(key: Hashable, task: asyncio.Task):
+    # Only our own entry; after an invalidation a newer run may own the key
+    if exploration_inflight.get(key) is task:
+        del exploration_inflight[key]
+
+# Background re-explorations started after a write
+_refresh_tasks = set()
+
+# One configured model per process, shared by every GeminiService instance
+_model: Optional[genai.GenerativeModel] = None
+
+def get_model() -> genai.GenerativeModel:
+    """Shared Gemini model, configured on first use"""
+    global _model
+    if _model is None:
         genai.configure(api_key=settings.GEMINI_API_KEY)
         # Use the most powerful available model
         try:
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
+            _model = genai.GenerativeModel('gemini-2.0-flash')
         except:
-            self.model = genai.GenerativeModel('gemini-pro')
+            _model = genai.GenerativeModel('gemini-pro')
+    return _model
+
+class GeminiService:
+    def __init__(self):
+        self.model = get_model()
+        
+    async def _generate(self, prompt: str):
+        """Run a Gemini generation without blocking the event loop"""
+        async with _generation_slots:
+            if hasattr(self.model, 'generate_content_async'):
+                return await self.model.generate_content_async(prompt)
+            return await asyncio.to_thread(self.model.generate_content, prompt)
+    
+    async def _generate_with_early_query(
+        self,
+        prompt: str,
+        db_service: DatabaseService,
+        on_chunk: Optional[Callable[[str], Any]] = None
+    ):
+        """Stream the reply and start its SQL as soon as a complete statement appears.
+
+        The bridge round trip then overlaps with the rest of the generation.
+        ``on_chunk`` receives each piece of text as it arrives.
+        Returns the full text, the SQL that was started early and its task.
+        """
+        if not hasattr(self.model, 'generate_content_async'):
+            response = await self._generate(prompt)
+            return response.text.strip(), None, None
         
+        early_sql = None
+        query_task = None
+        buffer = ""
+        try:
+            async with _generation_slots:
+                stream = await self.model.generate_content_async(prompt, stream=True)
+                async for chunk in stream:
+                    buffer += chunk.text
+                    if on_chunk is not None:
+                        on_chunk(chunk.text)
+                    if query_task is None:
+                        early_sql = self._extract_sql_query(buffer)
+                        # Only reads start early: a write can't be taken back if
+                        # the finished reply turns out to hold a different statement
+                        if early_sql and is_select(early_sql):
+                            query_task = asyncio.create_task(db_service.execute_query(early_sql))
+        except BaseException:
+            if query_task is not None:
+                query_task.cancel()
+            raise
+        
+        return buffer.strip(), early_sql, query_task
+    
     async def explore_database_adaptively(self, db_service: DatabaseService) -> Dict[str, Any]:
         """Explore database adaptively to understand its content"""
         try:
@@ -27,48 +245,102 @@ class GeminiService:
             if not table_schema:
                 return {"status": "no_tables", "tables": []}
             
-            # Get sample data from each table to understand content
+            # Sample every table concurrently; the semaphore caps in-flight bridge calls
+            semaphore = asyncio.Semaphore(SAMPLE_CONCURRENCY)
+            
+            async def _sample(table_name, table_info):
+                async with semaphore:
+                    result = await db_service.execute_query(f"SELECT * FROM {table_name} LIMIT 3")
+                return table_info, result
+            
+            results = await asyncio.gather(
+                *(_sample(name, info) for name, info in table_schema.items()),
+                return_exceptions=True
+            )
+            
             database_content = {}
             sample_insights = []
             
-            for table_name, table_info in table_schema.items():
-                try:
-                    # Get sample data
-                    result = await db_service.execute_query(f"SELECT * FROM {table_name} LIMIT 3")
-                    if result.get('success') and result.get('data'):
-                        sample_data = result['data']
-                        database_content[table_name] = {
-                            'columns': table_info.get('columns', []),
-                            'sample_data': sample_data,
-                            'sample_size': len(sample_data)
-                        }
-                        
-                        # Analyze sample data for insights
-                        if sample_data:
-                            sample_insights.append(f"Tabel {table_name}: {len(sample_data)} sample records dengan kolom {table_info.get('columns', [])}")
-                            
-                except Exception as e:
-                    logger.warning(f"Could not sample table {table_name}: {e}")
+            for table_name, outcome in zip(table_schema, results):
+                if isinstance(outcome, Exception):
+                    logger.warning("Could not sample table %s: %s", table_name, outcome)
                     continue
+                
+                table_info, result = outcome
+                if result.get('success') and result.get('data'):
+                    sample_data = result['data']
+                    database_content[table_name] = {
+                        'columns': table_info.get('columns', []),
+                        'sample_data': sample_data,
+                        'sample_size': len(sample_data)
+                    }
+                    
+                    # Analyze sample data for insights
+                    if sample_data:
+                        sample_insights.append(f"Tabel {table_name}: {len(sample_data)} sample records dengan kolom {table_info.get('columns', [])}")
             
             return {
                 "status": "success",
                 "tables": list(table_schema.keys()),
                 "table_count": len(table_schema),
                 "database_content": database_content,
-                "sample_insights": sample_insights
+                "sample_insights": sample_insights,
+                # Identifies this snapshot in reply cache keys; changes whenever content does
+                "digest": _digest(orjson.dumps(database_content, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS))
             }
             
         except Exception as e:
-            logger.error(f"Error exploring database: {e}")
+            logger.error("Error exploring database: %s", e)
             return {"status": "error", "error": str(e)}
     
-    async def process_free_form_chat(self, user_query: str, db_service: DatabaseService) -> dict:
-        """Process ANY user question and adapt to the database"""
+    async def _get_exploration(self, db_service: DatabaseService) -> Dict[str, Any]:
+        """explore_database_adaptively, served from cache while it is fresh.
+
+        Concurrent misses for the same database (parallel chat turns, or a turn
+        arriving during a background refresh) await one shared exploration.
+        """
+        key = db_service.exploration_key()
+        cached = exploration_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        task = exploration_inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._explore_and_cache(key, db_service))
+            exploration_inflight[key] = task
+            task.add_done_callback(lambda done: _forget_inflight(key, done))
+        # shield: one cancelled caller must not abort the exploration the others await
+        return await asyncio.shield(task)
+    
+    async def _explore_and_cache(self, key: Hashable, db_service: DatabaseService) -> Dict[str, Any]:
+        exploration = await self.explore_database_adaptively(db_service)
+        # Not cached if the system was edited or removed meanwhile (entry dropped)
+        if exploration.get('status') == 'success' and exploration_inflight.get(key) is asyncio.current_task():
+            exploration_cache.set(key, exploration)
+        return exploration
+    
+    def _refresh_exploration(self, db_service: DatabaseService):
+        """Start re-exploring the database without waiting for it"""
+        task = asyncio.create_task(self._get_exploration(db_service))
+        # Hold a reference until done so the task is not garbage-collected mid-flight
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+    
+    async def process_free_form_chat(
+        self,
+        user_query: str,
+        db_service: DatabaseService,
+        on_chunk: Optional[Callable[[str], Any]] = None
+    ) -> dict:
+        """Process ANY user question and adapt to the database.
+
+        ``on_chunk`` gets the draft reply as it is generated, before any data
+        enhancement; the returned ``response`` is the final text.
+        """
         
         try:
             # First, explore what's in the database
-            db_exploration = await self.explore_database_adaptively(db_service)
+            db_exploration = await self._get_exploration(db_service)
             
             if db_exploration.get('status') == 'no_tables':
                 return {
@@ -81,20 +353,40 @@ class GeminiService:
             # Prepare context about the database
             db_context = self._prepare_database_context(db_exploration)
             
-            # Generate adaptive response based on user query and database content
-            prompt = self._build_adaptive_prompt(user_query, db_context, db_exploration)
+            # Same question against the same database snapshot: reuse the earlier reply
+            digest = db_exploration.get('digest')
+            cache_key = _response_key("adaptive", user_query, digest) if digest else None
+            ai_response = _response_cache.get(cache_key) if cache_key else None
+            early_sql = query_task = None
             
-            # Get AI response
-            response = self.model.generate_content(prompt)
-            ai_response = response.text.strip()
+            if ai_response is None:
+                # Generate adaptive response based on user query and database content
+                prompt = self._build_adaptive_prompt(user_query, db_context, db_exploration)
+                
+                # Get AI response; a complete SQL statement starts executing mid-stream
+                ai_response, early_sql, query_task = await self._generate_with_early_query(prompt, db_service, on_chunk)
+                if cache_key and ai_response:
+                    _response_cache.set(cache_key, ai_response, ttl=ADAPTIVE_RESPONSE_TTL)
             
             # Check if AI wants to execute SQL
             sql_query = self._extract_sql_query(ai_response)
             query_result = None
             
+            if query_task is not None and early_sql != sql_query:
+                # The finished text resolves to a different statement (e.g. a later code block)
+                query_task.cancel()
+                query_task = None
+            
             if sql_query:
                 # Execute the suggested SQL
-                query_result = await db_service.execute_query(sql_query)
+                query_result = await (query_task or db_service.execute_query(sql_query))
+                if 'affected_rows' in query_result:
+                    # Data changed; the cached samples no longer describe it.
+                    # Re-explore in the background so the next turn finds it warm.
+                    key = db_service.exploration_key()
+                    exploration_cache.pop(key)
+                    exploration_inflight.pop(key, None)
+                    self._refresh_exploration(db_service)
                 
                 # If we got data, enhance the response
                 if query_result.get('success') and query_result.get('data'):
@@ -110,7 +402,7 @@ class GeminiService:
             }
             
         except Exception as e:
-            logger.error(f"Error in free form chat: {str(e)}")
+            logger.error("Error in free form chat: %s", e)
             return {
                 "response": f"❌ Maaf, ada gangguan teknis: {str(e)}",
                 "sql_query": None,
@@ -136,74 +428,41 @@ class GeminiService:
     
     def _build_adaptive_prompt(self, user_query: str, db_context: str, db_exploration: Dict[str, Any]) -> str:
         """Build adaptive prompt based on user question and database content"""
+        # Uncut content serializes the same for every question, so it is
+        # encoded once per exploration snapshot
+        digest = db_exploration.get('digest')
+        content_json = _content_json_cache.get(digest) if digest else None
+        if content_json is None:
+            full_content = db_exploration.get('database_content', {})
+            database_content = _compact_db_content(full_content, user_query)
+            content_json = _prompt_json(database_content)
+            uncut = len(database_content) == len(full_content) and not any(
+                '_truncated' in table for table in database_content.values()
+            )
+            if digest and uncut:
+                _content_json_cache.set(digest, content_json)
         
-        prompt = f"""
-        Anda adalah asisten AI yang sangat fleksibel dan adaptif. User dapat bertanya APA SAJA, dan Anda harus merespons dengan cara yang paling membantu berdasarkan database yang tersedia.
-
-        KONTEKS DATABASE:
-        {db_context}
-
-        ISI DATABASE DETAIL:
-        {json.dumps(db_exploration.get('database_content', {}), indent=2, ensure_ascii=False)}
-
-        PERTANYAAN USER: "{user_query}"
-
-        INSTRUKSI FLEKSIBEL:
-        1. PERTIMBANGAN AWAL: Pahami intent user - apakah mereka butuh data, penjelasan, bantuan teknis, atau sesuatu yang lain?
-        2. ADAPTASI: Sesuaikan respons Anda dengan apa yang tersedia di database
-        3. JIKA RELEVAN: Sarankan query SQL yang berguna (jika ada data yang sesuai)
-        4. JIKA TIDAK RELEVAN: Berikan respons umum yang membantu tanpa data
-        5. JIKA TIDAK PAHAM: Akui dengan jujur dan tawarkan bantuan alternatif
-        6. SELALU: Bersikap helpful, informatif, dan natural
-
-        JENIS PERTANYAAN & CONTOH RESPONS:
-
-        PERTANYAAN TENTANG DATA:
-        User: "berapa total penjualan?"
-        AI: "Saya akan cek data penjualan Anda. [SQL: SELECT COUNT(*) FROM sales]"
-        "Berdasarkan data, total penjualan adalah 150 transaksi."
-
-         PERTANYAAN TENTANG STRUKTUR:
-        User: "tabel apa saja yang ada?"
-        AI: "Database Anda memiliki 3 tabel: products, customers, orders. Mau lihat data dari tabel mana?"
-
-        PERTANYAAN BISNIS:
-        User: "bagaimana performa bisnis?"
-        AI: "Saya analisis data Anda. [SQL terkait] Berdasarkan data, revenue bulan ini Rp 50jt dengan 100 transaksi."
-
-        PERTANYAAN TEKNIS:
-        User: "cara query data customer?"
-        AI: "Untuk melihat data customer, gunakan: SELECT * FROM customers LIMIT 10"
-
-        PERTANYAAN UMUM:
-        User: "halo"
-        AI: "Halo! Saya siap membantu analisis database Anda. Ada yang bisa saya bantu?"
-
-        PERTANYAAN TIDAK RELEVAN:
-        User: "cuaca hari ini bagaimana?"
-        AI: "Saya fokus membantu analisis database Anda. Untuk cuaca, mungkin butuh sumber lain. Ada yang bisa saya bantu terkait data Anda?"
-
-        FORMAT RESPONS:
-        - Natural conversation
-        - Jelaskan apa yang Anda lakukan
-        - Sertakan data jika ada
-        - Tawarkan bantuan lanjutan
-        - Jangan buat user bingung
-
-        RESPONS ANDA:
-        """
-        
-        return prompt
+        return "".join((
+            _ADAPTIVE_PROMPT_PREFIX,
+            "KONTEKS DATABASE:\n", db_context,
+            "\n\nISI DATABASE DETAIL:\n", content_json,
+            '\n\nPERTANYAAN USER: "', user_query,
+            '"\n\nRESPONS ANDA:\n'
+        ))
     
     def _extract_sql_query(self, ai_response: str) -> str:
         """Extract SQL query from AI response if present"""
         # Look for SQL in code blocks
-        sql_match = re.search(r'```sql\s*(.*?)\s*```', ai_response, re.DOTALL)
-        if sql_match:
-            return sql_match.group(1).strip()
+        # Two linear finds: a lazy DOTALL regex rescans to the end from every
+        # unclosed fence, which is quadratic on long replies
+        start = ai_response.find(_SQL_FENCE_OPEN)
+        if start != -1:
+            end = ai_response.find(_SQL_FENCE_CLOSE, start + len(_SQL_FENCE_OPEN))
+            if end != -1:
+                return ai_response[start + len(_SQL_FENCE_OPEN):end].strip()
         
         # Look for SQL in square brackets
-        sql_match = re.search(r'\[SQL:\s*(.*?)\]', ai_response)
+        sql_match = _SQL_BRACKET_RE.search(ai_response)
         if sql_match:
             return sql_match.group(1).strip()
         
@@ -219,31 +478,37 @@ class GeminiService:
         if not data:
             return original_response + "\n\n Tidak ada data yang ditemukan dengan kriteria tersebut."
         
-        prompt = f"""
-        RESPONS ASLI AI: {original_response}
-        
-        HASIL DATA NYATA: {json.dumps(data, indent=2, ensure_ascii=False)}
-        
-        PERTANYAAN USER: "{user_query}"
+        cache_key = _response_key("enhance", user_query, original_response, orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        Tugas: Perbaiki respons AI dengan menyertakan data aktual yang didapat.
-        Buat respons yang lebih informatif dan akurat berdasarkan data nyata.
-        Pertahankan gaya conversational yang natural.
-        
-        RESPONS YANG DIPERBAIKI:
-        """
+        prompt = "".join((
+            _ENHANCE_PROMPT_PREFIX,
+            "RESPONS ASLI AI: ", original_response,
+            "\n\nHASIL DATA NYATA: ", _prompt_json(data),
+            '\n\nPERTANYAAN USER: "', user_query,
+            '"\n\nRESPONS YANG DIPERBAIKI:\n'
+        ))
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            response = await self._generate(prompt)
+            enhanced = response.text.strip()
+            _response_cache.set(cache_key, enhanced)
+            return enhanced
         except Exception as e:
-            logger.error(f"Error enhancing response with data: {e}")
+            logger.error("Error enhancing response with data: %s", e)
             # Fallback: append basic data info
             return f"{original_response}\n\n Ditemukan {len(data)} record data."
     
-    async def process_universal_chat(self, user_query: str, db_service: DatabaseService) -> dict:
+    async def process_universal_chat(
+        self,
+        user_query: str,
+        db_service: DatabaseService,
+        on_chunk: Optional[Callable[[str], Any]] = None
+    ) -> dict:
         """Main method for flexible chat"""
-        return await self.process_free_form_chat(user_query, db_service)
+        return await self.process_free_form_chat(user_query, db_service, on_chunk)
     
     async def process_chat_message(self, user_query: str, db_service: DatabaseService) -> dict:
         """Alias for compatibility"""
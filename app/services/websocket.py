@@ -1,43 +1,96 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List
-import json
+from typing import Any, Dict, List, Set, Tuple
+import asyncio
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Events queued for a user within this window go out as one frame
+BATCH_WINDOW_SECONDS = 0.01
+
+# Sends started together per gather() when fanning out to many sockets
+BROADCAST_BATCH_SIZE = 50
+
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+        # Sets: O(1) add/remove however many tabs a user has open
+        self.active_connections: Dict[int, Set[WebSocket]] = {}
+        self._pending_events: Dict[int, List[Dict[str, Any]]] = {}
+        self._flush_tasks: Dict[int, asyncio.Task] = {}
     
     async def connect(self, websocket: WebSocket, user_id: int):
         await websocket.accept()
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
-        self.active_connections[user_id].append(websocket)
+        self.active_connections.setdefault(user_id, set()).add(websocket)
         logger.info(f"User {user_id} connected. Total connections: {len(self.active_connections[user_id])}")
     
     def disconnect(self, websocket: WebSocket, user_id: int):
-        if user_id in self.active_connections:
-            self.active_connections[user_id].remove(websocket)
-            if not self.active_connections[user_id]:
+        connections = self.active_connections.get(user_id)
+        if connections is not None:
+            # discard: the socket may already be pruned after a failed send
+            connections.discard(websocket)
+            if not connections:
                 del self.active_connections[user_id]
         logger.info(f"User {user_id} disconnected")
     
     async def send_personal_message(self, message: str, user_id: int):
         if user_id in self.active_connections:
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_text(message)
-                except Exception as e:
-                    logger.error(f"Error sending message to user {user_id}: {str(e)}")
-                    self.disconnect(connection, user_id)
+            targets = [(user_id, connection) for connection in self.active_connections[user_id]]
+            await self._send_to(targets, message)
+    
+    async def _send_to(self, targets: List[Tuple[int, WebSocket]], message: str):
+        """Send to many sockets concurrently, so one slow client doesn't hold up the rest.
+
+        ``targets`` is a snapshot; dead sockets are collected and only pruned
+        once every send has finished, never while the fan-out is in progress.
+        """
+        dead = []
+        for start in range(0, len(targets), BROADCAST_BATCH_SIZE):
+            batch = targets[start:start + BROADCAST_BATCH_SIZE]
+            results = await asyncio.gather(
+                *(connection.send_text(message) for _, connection in batch),
+                return_exceptions=True
+            )
+            for target, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error sending message to user {target[0]}: {str(result)}")
+                    dead.append(target)
+        for user_id, connection in dead:
+            self.disconnect(connection, user_id)
+    
+    def enqueue(self, user_id: int, event: Dict[str, Any]):
+        """Queue an event for a user; events from the same tick share one WS frame"""
+        if user_id not in self.active_connections:
+            return
+        self._pending_events.setdefault(user_id, []).append(event)
+        if user_id not in self._flush_tasks:
+            self._flush_tasks[user_id] = asyncio.create_task(self._flush_later(user_id))
+    
+    async def _flush_later(self, user_id: int):
+        # One flusher per user drains until nothing is pending, so a slow send
+        # never overlaps the next one and frames keep their enqueue order
+        try:
+            while True:
+                await asyncio.sleep(BATCH_WINDOW_SECONDS)
+                events = self._pending_events.pop(user_id, None)
+                if not events:
+                    return
+                # A single event keeps its original shape; several are wrapped in a batch envelope
+                payload = events[0] if len(events) == 1 else {"type": "batch", "events": events}
+                await self.send_personal_message(orjson.dumps(payload).decode(), user_id)
+        finally:
+            self._flush_tasks.pop(user_id, None)
     
     async def broadcast(self, message: str):
-        for user_connections in self.active_connections.values():
-            for connection in user_connections:
-                try:
-                    await connection.send_text(message)
-                except Exception as e:
-                    logger.error(f"Error broadcasting message: {str(e)}")
+        targets = [
+            (user_id, connection)
+            for user_id, user_connections in self.active_connections.items()
+            for connection in user_connections
+        ]
+        await self._send_to(targets, message)
+    
+    async def broadcast_json(self, obj: Any):
+        """Broadcast a JSON event, serialized once for every connection"""
+        await self.broadcast(orjson.dumps(obj).decode())
 
 manager = ConnectionManager()
\ No newline at end of file
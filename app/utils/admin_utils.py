@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import and_, case, desc, func, select, text, true
 from datetime import datetime, timedelta
 from app.models.user import User, UserSystem
 from app.models.chat import ChatSession, ChatMessage
@@ -8,60 +8,72 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+def _days_ago(db: Session, days: int):
+    """SQL expression for NOW() minus `days`, evaluated on the database's own clock"""
+    if db.get_bind().dialect.name == "mysql":
+        # pymysql would bind a timedelta as a TIME string, so spell the interval out
+        return func.date_sub(func.now(), text(f"INTERVAL {int(days)} DAY"))
+    return func.now() - timedelta(days=days)
+
 class AdminUtils:
     
     @staticmethod
     def get_system_stats(db: Session) -> Dict[str, Any]:
         """Get comprehensive system statistics for admin dashboard"""
         
-        # User statistics
-        total_users = db.query(User).count()
-        active_users = db.query(User).filter(User.is_active == True).count()
-        admin_users = db.query(User).filter(User.is_admin == True).count()
-        
-        # Today's active users (logged in today)
-        today = datetime.utcnow().date()
-        active_today = db.query(User).filter(
-            User.last_login >= today,
-            User.is_active == True
-        ).count()
-        
-        # New users this week
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        new_users_week = db.query(User).filter(
-            User.created_at >= week_ago
-        ).count()
+        # Windows are computed by the database, so they match its NOW()-based
+        # created_at defaults regardless of app-server clock or timezone
+        today = func.current_date()
+        week_ago = _days_ago(db, 7)
+        day_ago = _days_ago(db, 1)
         
-        # System statistics
-        total_systems = db.query(UserSystem).count()
-        active_systems = db.query(UserSystem).filter(UserSystem.is_active == True).count()
+        # One round trip: each table is aggregated once, with COUNT(CASE ...)
+        # standing in for COUNT(*) FILTER (WHERE ...), which MySQL lacks
+        users = select(
+            func.count().label("total"),
+            func.count(case((User.is_active == True, 1))).label("active"),
+            func.count(case((User.is_admin == True, 1))).label("admins"),
+            # Today's active users (logged in today)
+            func.count(case((and_(User.last_login >= today, User.is_active == True), 1))).label("active_today"),
+            # New users this week
+            func.count(case((User.created_at >= week_ago, 1))).label("new_week")
+        ).subquery()
+        systems = select(
+            func.count().label("total"),
+            func.count(case((UserSystem.is_active == True, 1))).label("active")
+        ).subquery()
+        messages = select(
+            func.count().label("total"),
+            # Recent activity (last 24 hours)
+            func.count(case((ChatMessage.created_at >= day_ago, 1))).label("recent")
+        ).subquery()
+        sessions = select(func.count()).select_from(ChatSession).scalar_subquery()
         
-        # Chat statistics
-        total_sessions = db.query(ChatSession).count()
-        total_messages = db.query(ChatMessage).count()
-        
-        # Recent activity (last 24 hours)
-        day_ago = datetime.utcnow() - timedelta(days=1)
-        recent_messages = db.query(ChatMessage).filter(
-            ChatMessage.created_at >= day_ago
-        ).count()
+        row = db.execute(
+            select(
+                users.c.total, users.c.active, users.c.admins, users.c.active_today, users.c.new_week,
+                systems.c.total.label("systems_total"), systems.c.active.label("systems_active"),
+                sessions.label("sessions_total"),
+                messages.c.total.label("messages_total"), messages.c.recent.label("messages_recent")
+            ).select_from(users.join(systems, true()).join(messages, true()))
+        ).one()
         
         return {
             "users": {
-                "total": total_users,
-                "active": active_users,
-                "admins": admin_users,
-                "active_today": active_today,
-                "new_this_week": new_users_week
+                "total": row.total,
+                "active": row.active,
+                "admins": row.admins,
+                "active_today": row.active_today,
+                "new_this_week": row.new_week
             },
             "systems": {
-                "total": total_systems,
-                "active": active_systems
+                "total": row.systems_total,
+                "active": row.systems_active
             },
             "chat": {
-                "total_sessions": total_sessions,
-                "total_messages": total_messages,
-                "recent_messages_24h": recent_messages
+                "total_sessions": row.sessions_total,
+                "total_messages": row.messages_total,
+                "recent_messages_24h": row.messages_recent
             },
             "timestamp": datetime.utcnow().isoformat()
         }
@@ -70,7 +82,15 @@ class AdminUtils:
     def get_user_activity(db: Session, days: int = 7) -> List[Dict[str, Any]]:
         """Get user activity data for admin monitoring"""
         
-        start_date = datetime.utcnow() - timedelta(days=days)
+        start_date = _days_ago(db, days)
+        
+        # Per-user counts as correlated subqueries: each one is an index range
+        # scan on (user_id, created_at), and users with no activity get 0
+        session_count = select(func.count(ChatSession.id)).where(ChatSession.user_id == User.id)
+        message_count = select(func.count(ChatMessage.id)).where(ChatMessage.user_id == User.id)
+        if days > 0:
+            session_count = session_count.where(ChatSession.created_at >= start_date)
+            message_count = message_count.where(ChatMessage.created_at >= start_date)
         
         # Get users with their activity counts
         user_activity = db.query(
@@ -81,39 +101,19 @@ class AdminUtils:
             User.last_login,
             User.login_count,
             User.created_at,
-            func.count(ChatSession.id).label('session_count'),
-            func.count(ChatMessage.id).label('message_count')
-        ).outerjoin(ChatSession, User.id == ChatSession.user_id)\
-         .outerjoin(ChatMessage, User.id == ChatMessage.user_id)\
-         .filter(
-            ChatSession.created_at >= start_date if days > 0 else True,
-            ChatMessage.created_at >= start_date if days > 0 else True
-         )\
-         .group_by(User.id)\
-         .order_by(desc(User.last_login))\
-         .all()
-        
-        result = []
-        for user in user_activity:
-            result.append({
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "full_name": user.full_name,
-                "last_login": user.last_login.isoformat() if user.last_login else None,
-                "login_count": user.login_count,
-                "created_at": user.created_at.isoformat(),
-                "session_count": user.session_count,
-                "message_count": user.message_count
-            })
+            session_count.scalar_subquery().label('session_count'),
+            message_count.scalar_subquery().label('message_count')
+        ).order_by(desc(User.last_login)).all()
         
-        return result
+        # Column labels already match the output keys. Datetimes are left to the
+        # response encoder, which emits the same ISO strings in C.
+        return [dict(row._mapping) for row in user_activity]
     
     @staticmethod
     def get_system_usage(db: Session) -> List[Dict[str, Any]]:
         """Get system usage statistics across all users"""
         
-        system_usage = db.query(
+        stmt = select(
             UserSystem.id,
             UserSystem.system_name,
             UserSystem.system_type,
@@ -127,24 +127,25 @@ class AdminUtils:
         ).join(User, UserSystem.user_id == User.id)\
          .outerjoin(ChatSession, UserSystem.id == ChatSession.system_id)\
          .group_by(UserSystem.id)\
-         .order_by(desc('usage_count'))\
-         .all()
+         .order_by(desc('usage_count'))
         
+        # Positional unpacking instead of per-field attribute lookups on each Row
         result = []
-        for system in system_usage:
+        for (system_id, system_name, system_type, db_host, db_name, is_active,
+             created_at, username, email, usage_count) in db.execute(stmt):
             result.append({
-                "id": system.id,
-                "system_name": system.system_name,
-                "system_type": system.system_type,
-                "db_host": system.db_host,
-                "db_name": system.db_name,
-                "is_active": system.is_active,
-                "created_at": system.created_at.isoformat(),
+                "id": system_id,
+                "system_name": system_name,
+                "system_type": system_type,
+                "db_host": db_host,
+                "db_name": db_name,
+                "is_active": is_active,
+                "created_at": created_at,
                 "user": {
-                    "username": system.username,
-                    "email": system.email
+                    "username": username,
+                    "email": email
                 },
-                "usage_count": system.usage_count
+                "usage_count": usage_count
             })
         
         return result
\ No newline at end of file
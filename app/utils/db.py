@@ -0,0 +1,5 @@
+from sqlalchemy.orm import Session, Query
+
+def record_exists(db: Session, query: Query) -> bool:
+    """Run SELECT EXISTS(...) for the query instead of materializing a row"""
+    return db.query(query.exists()).scalar()
@@ -1,12 +1,41 @@
+import functools
 import logging
 from typing import Dict, Any
 
 def setup_logging():
+    # The format never prints thread/process fields, so skip collecting them per record
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
+def _memoize_callable_check(check):
+    cached = functools.lru_cache(maxsize=None)(check)
+
+    @functools.wraps(check)
+    def wrapper(call):
+        try:
+            return cached(call)
+        except TypeError:  # unhashable dependency callable
+            return check(call)
+    return wrapper
+
+def cache_dependency_introspection():
+    """Memoize FastAPI's per-request inspect checks on dependency callables.
+
+    solve_dependencies re-runs is_gen_callable/is_coroutine_callable for every
+    dependency on every request; the answers never change for a given callable.
+    """
+    from fastapi.dependencies import utils as dependency_utils
+
+    for name in ("is_gen_callable", "is_async_gen_callable", "is_coroutine_callable"):
+        check = getattr(dependency_utils, name, None)
+        if check is not None and not hasattr(check, "__wrapped__"):
+            setattr(dependency_utils, name, _memoize_callable_check(check))
+
 def create_response(success: bool, message: str, data: Any = None) -> Dict[str, Any]:
     return {
         "success": success,
@@ -1,18 +1,43 @@
+import hashlib
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
 
 from app.config import settings
+from app.utils.cache import TTLCache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# One shared hasher. New hashes are argon2id; bcrypt hashes from before still
+# verify and are reported by password_needs_rehash so login can upgrade them.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=47104,  # KiB (46 MiB)
+    argon2__parallelism=2
+)
+
+# Successful (hash, sha256(plain)) pairs; never keyed on the plaintext itself.
+# Failures are not cached so wrong guesses always pay the full KDF cost.
+_verified_cache = TTLCache(maxsize=2048, ttl=300)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    """Password verify, memoized so repeat logins with the same credentials skip the KDF"""
+    key = (hashed_password, hashlib.sha256(plain_password.encode()).hexdigest())
+    if _verified_cache.get(key):
+        return True
+    if pwd_context.verify(plain_password, hashed_password):
+        _verified_cache.set(key, True)
+        return True
+    return False
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True for hashes made with a deprecated scheme or older parameters"""
+    return pwd_context.needs_update(hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -23,16 +48,22 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> Optional[str]:
+def decode_access_token(token: str) -> Optional[dict]:
+    """Verify token signature/expiry and return its claims"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        return username
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
 
+def verify_token(token: str) -> Optional[str]:
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    username: str = payload.get("sub")
+    if username is None:
+        return None
+    return username
+
 def validate_password_strength(password: str) -> bool:
     """Validate password strength"""
     if len(password) < 8:
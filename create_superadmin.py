@@ -2,41 +2,48 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.database import SessionLocal
+from sqlalchemy import exists, insert, literal, select
+from app.database import SessionLocal, init_db
 from app.models.user import User
 from app.utils.security import get_password_hash
 
 def create_superadmin():
+    """Create the default superadmin if none exists; False if that failed"""
+    init_db()
     db = SessionLocal()
     try:
-        # Check if superadmin already exists
-        existing = db.query(User).filter(User.is_superadmin == True).first()
-        if existing:
-            print(f"Superadmin already exists: {existing.username}")
-            return
-        
-        # Create superadmin
-        superadmin = User(
-            email="admin@astral.com",
-            username="superadmin",
-            full_name="System Super Administrator",
-            hashed_password=get_password_hash("admin123"),
-            is_active=True,
-            is_admin=True,
-            is_superadmin=True
+        # One atomic INSERT ... SELECT: the row is only written when no
+        # superadmin exists yet, so there is no separate lookup first
+        new_superadmin = select(
+            literal("admin@astral.com"),
+            literal("superadmin"),
+            literal("System Super Administrator"),
+            literal(get_password_hash("admin123")),
+            literal(True),
+            literal(True),
+            literal(True)
+        ).where(~exists().where(User.is_superadmin == True))
+        result = db.execute(
+            insert(User).from_select(
+                ["email", "username", "full_name", "hashed_password", "is_active", "is_admin", "is_superadmin"],
+                new_superadmin
+            )
         )
-        
-        db.add(superadmin)
         db.commit()
-        db.refresh(superadmin)
+        
+        if result.rowcount == 0:
+            print("Superadmin already exists")
+            return True
         
         print("Superadmin created successfully!")
         print(f"Username: superadmin")
         print(f"Password: admin123")
         print("Please change the password immediately after first login!")
+        return True
         
     except Exception as e:
         print(f"Error creating superadmin: {e}")
+        return False
     finally:
         db.close()
 
@@ -30,6 +30,18 @@ $action = $_GET['action'] ?? 'test';
 // Decide driver based on payload.system_type or default to mysql
 $system_type = strtolower($input['system_type'] ?? 'mysql');
 
+// Cheap fingerprint of every column's table, name and type. Clients compare it
+// with the value returned alongside a cached schema to skip re-fetching it.
+function schema_version($pdo, $system_type) {
+    if ($system_type === 'postgres' || $system_type === 'postgresql') {
+        $stmt = $pdo->query("SELECT COUNT(*) AS n, COALESCE(md5(string_agg(table_name || '.' || column_name || '.' || data_type, ',' ORDER BY table_name, ordinal_position)), '') AS checksum FROM information_schema.columns WHERE table_schema = 'public'");
+    } else {
+        $stmt = $pdo->query("SELECT COUNT(*) AS n, COALESCE(SUM(CRC32(CONCAT_WS('.', TABLE_NAME, COLUMN_NAME, COLUMN_TYPE))), 0) AS checksum FROM information_schema.columns WHERE table_schema = DATABASE()");
+    }
+    $row = $stmt->fetch(PDO::FETCH_ASSOC);
+    return $row['n'] . ':' . $row['checksum'];
+}
+
 try {
     // If bridge is used as single-hosted for a fixed DB on that server,
     // you may want to ignore passed credentials and use local config.
@@ -52,10 +64,12 @@ try {
         $dsn = "mysql:host={$db_host};port={$db_port};dbname={$db_name};charset=utf8mb4";
     }
 
-    // Prepare PDO
+    // Prepare PDO. Persistent handles are kept per DSN+user by the PHP worker,
+    // so repeated calls skip the TCP connect and auth handshake.
     $pdo = new PDO($dsn, $db_user, $db_pass, [
         PDO::ATTR_ERRMODE => PDO::ERRMODE_EXCEPTION,
         PDO::ATTR_DEFAULT_FETCH_MODE => PDO::FETCH_ASSOC,
+        PDO::ATTR_PERSISTENT => true,
     ]);
 
     switch ($action) {
@@ -84,6 +98,7 @@ try {
                     "connection_test" => $row['connection_test'] ?? null,
                     "server_time" => $row['server_time'] ?? null,
                     "table_count" => $tc['table_count'] ?? 0,
+                    "schema_version" => schema_version($pdo, $system_type),
                     "connection_type" => ($system_type === 'postgres' ? 'pgsql' : 'mysql')
                 ]
             ]);
@@ -92,37 +107,31 @@ try {
         case 'schema':
             $schema = [];
 
+            // One information_schema round trip for every table's columns, grouped here
             if ($system_type === 'postgres' || $system_type === 'postgresql') {
-                $stmt = $pdo->query("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public' AND table_type = 'BASE TABLE'");
-                $tables = $stmt->fetchAll(PDO::FETCH_ASSOC);
-                foreach ($tables as $t) {
-                    $table_name = $t['table_name'];
-                    $cstmt = $pdo->prepare("SELECT column_name, data_type, is_nullable FROM information_schema.columns WHERE table_name = :t");
-                    $cstmt->execute([':t'=>$table_name]);
-                    $cols = $cstmt->fetchAll(PDO::FETCH_ASSOC);
-                    $schema[$table_name] = [
-                        "columns" => array_column($cols, 'column_name'),
-                        "column_details" => $cols
-                    ];
+                $stmt = $pdo->query("SELECT c.table_name, c.column_name, c.data_type, c.is_nullable FROM information_schema.columns c JOIN information_schema.tables t ON t.table_schema = c.table_schema AND t.table_name = c.table_name WHERE c.table_schema = 'public' AND t.table_type = 'BASE TABLE' ORDER BY c.table_name, c.ordinal_position");
+                foreach ($stmt->fetchAll(PDO::FETCH_ASSOC) as $col) {
+                    $table_name = $col['table_name'];
+                    unset($col['table_name']);
+                    $schema[$table_name]["columns"][] = $col['column_name'];
+                    $schema[$table_name]["column_details"][] = $col;
                 }
             } else {
-                $stmt = $pdo->query("SELECT TABLE_NAME as table_name FROM information_schema.tables WHERE table_schema = DATABASE()");
-                $tables = $stmt->fetchAll(PDO::FETCH_ASSOC);
-                foreach ($tables as $t) {
-                    $table_name = $t['table_name'];
-                    $cstmt = $pdo->query("DESCRIBE `{$table_name}`");
-                    $cols = $cstmt->fetchAll(PDO::FETCH_ASSOC);
-                    $schema[$table_name] = [
-                        "columns" => array_column($cols, 'Field'),
-                        "column_details" => $cols
-                    ];
+                // Aliased to the DESCRIBE column names the previous per-table loop returned
+                $stmt = $pdo->query("SELECT TABLE_NAME AS table_name, COLUMN_NAME AS `Field`, COLUMN_TYPE AS `Type`, IS_NULLABLE AS `Null`, COLUMN_KEY AS `Key`, COLUMN_DEFAULT AS `Default`, EXTRA AS `Extra` FROM information_schema.columns WHERE table_schema = DATABASE() ORDER BY TABLE_NAME, ORDINAL_POSITION");
+                foreach ($stmt->fetchAll(PDO::FETCH_ASSOC) as $col) {
+                    $table_name = $col['table_name'];
+                    unset($col['table_name']);
+                    $schema[$table_name]["columns"][] = $col['Field'];
+                    $schema[$table_name]["column_details"][] = $col;
                 }
             }
 
             echo json_encode([
                 "success" => true,
                 "schema" => $schema,
-                "table_count" => count($schema)
+                "table_count" => count($schema),
+                "schema_version" => schema_version($pdo, $system_type)
             ]);
             break;
 
@@ -147,6 +156,40 @@ try {
             ]);
             break;
 
+        case 'execute_batch':
+            // Several SELECTs over one connection; results keep the order of "queries"
+            $queries = $input['queries'] ?? [];
+            if (!is_array($queries) || empty($queries)) {
+                echo json_encode(["success" => false, "error" => "No queries provided"]);
+                break;
+            }
+
+            $results = [];
+            foreach ($queries as $query) {
+                $query = trim((string)$query);
+                if (stripos($query, 'SELECT') !== 0) {
+                    $results[] = ["success" => false, "error" => "Only SELECT queries are allowed"];
+                    continue;
+                }
+                try {
+                    $stmt = $pdo->query($query);
+                    $rows = $stmt->fetchAll(PDO::FETCH_ASSOC);
+                    $results[] = [
+                        "success" => true,
+                        "data" => $rows,
+                        "row_count" => count($rows)
+                    ];
+                } catch (PDOException $e) {
+                    $results[] = ["success" => false, "error" => $e->getMessage()];
+                }
+            }
+
+            echo json_encode([
+                "success" => true,
+                "results" => $results
+            ]);
+            break;
+
         default:
             echo json_encode(["success" => false, "error" => "Invalid action"]);
             break;
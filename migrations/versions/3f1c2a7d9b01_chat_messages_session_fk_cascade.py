@@ -0,0 +1,45 @@
+"""chat_messages.session_id cascades from chat_sessions
+
+Revision ID: 3f1c2a7d9b01
+Revises: 
+Create Date: 2026-10-15 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7d9b01'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+FK_NAME = "fk_chat_messages_session"
+
+
+def _session_fks():
+    inspector = sa.inspect(op.get_bind())
+    return [
+        fk["name"] for fk in inspector.get_foreign_keys("chat_messages")
+        if fk["referred_table"] == "chat_sessions"
+        and fk["constrained_columns"] == ["session_id"]
+    ]
+
+
+def upgrade() -> None:
+    # Tables built by create_all before the FK existed have orphaned messages
+    # left behind by old session deletes; the constraint can't be added over them
+    op.execute(
+        "DELETE FROM chat_messages WHERE session_id NOT IN (SELECT id FROM chat_sessions)"
+    )
+    for name in _session_fks():
+        op.drop_constraint(name, "chat_messages", type_="foreignkey")
+    op.create_foreign_key(
+        FK_NAME, "chat_messages", "chat_sessions",
+        ["session_id"], ["id"], ondelete="CASCADE"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(FK_NAME, "chat_messages", type_="foreignkey")
@@ -0,0 +1,63 @@
+"""chat_messages.query_result Text -> JSON
+
+Revision ID: 8a4e6b2c5d17
+Revises: 3f1c2a7d9b01
+Create Date: 2026-10-15 09:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e6b2c5d17'
+down_revision = '3f1c2a7d9b01'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    # The old reader treated empty text as no result and wrapped undecodable
+    # text as {"raw": ...}; store the same values so the type change can't fail
+    op.execute("UPDATE chat_messages SET query_result = NULL WHERE query_result = ''")
+    if dialect == "postgresql":
+        # No JSON_VALID equivalent before PostgreSQL 16, so cast through a
+        # throwaway helper that falls back to {"raw": ...} on a failed parse
+        op.execute(
+            "CREATE FUNCTION _astral_text_to_jsonb(value text) RETURNS jsonb AS $$ "
+            "BEGIN RETURN value::jsonb; "
+            "EXCEPTION WHEN others THEN RETURN jsonb_build_object('raw', value); "
+            "END; $$ LANGUAGE plpgsql IMMUTABLE"
+        )
+        op.alter_column(
+            "chat_messages", "query_result",
+            type_=postgresql.JSONB(), existing_type=sa.Text(),
+            postgresql_using="_astral_text_to_jsonb(query_result)"
+        )
+        op.execute("DROP FUNCTION _astral_text_to_jsonb(text)")
+    else:
+        op.execute(
+            "UPDATE chat_messages SET query_result = JSON_OBJECT('raw', query_result) "
+            "WHERE query_result IS NOT NULL AND NOT JSON_VALID(query_result)"
+        )
+        op.alter_column(
+            "chat_messages", "query_result",
+            type_=sa.JSON(), existing_type=sa.Text()
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.alter_column(
+            "chat_messages", "query_result",
+            type_=sa.Text(), existing_type=postgresql.JSONB(),
+            postgresql_using="query_result::text"
+        )
+    else:
+        op.alter_column(
+            "chat_messages", "query_result",
+            type_=sa.Text(), existing_type=sa.JSON()
+        )
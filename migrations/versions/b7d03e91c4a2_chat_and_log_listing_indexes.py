@@ -0,0 +1,36 @@
+"""chat and log listing indexes
+
+Revision ID: b7d03e91c4a2
+Revises: 8a4e6b2c5d17
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d03e91c4a2'
+down_revision = '8a4e6b2c5d17'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_chat_sessions_user_updated", "chat_sessions", ["user_id", "updated_at"]),
+    ("ix_chat_messages_session_created", "chat_messages", ["session_id", "created_at"]),
+    ("ix_chat_messages_created", "chat_messages", ["created_at"]),
+    ("ix_system_logs_user_created", "system_logs", ["user_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        # Tables created by create_all after the models gained the index already have it
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
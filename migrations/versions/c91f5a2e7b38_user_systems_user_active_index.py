@@ -0,0 +1,33 @@
+"""user_systems owner lookup index
+
+Revision ID: c91f5a2e7b38
+Revises: b7d03e91c4a2
+Create Date: 2026-10-15 12:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c91f5a2e7b38'
+down_revision = 'b7d03e91c4a2'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_user_systems_user_active", "user_systems", ["user_id", "is_active"]),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        # Tables created by create_all after the models gained the index already have it
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,34 @@
+"""chat activity indexes
+
+Revision ID: d2a86f0b13e5
+Revises: c91f5a2e7b38
+Create Date: 2026-10-15 12:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a86f0b13e5'
+down_revision = 'c91f5a2e7b38'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_chat_sessions_user_created", "chat_sessions", ["user_id", "created_at"]),
+    ("ix_chat_messages_user_created", "chat_messages", ["user_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        # Tables created by create_all after the models gained the index already have it
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
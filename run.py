@@ -6,5 +6,7 @@ if __name__ == "__main__":
         host="0.0.0.0", 
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        ws_ping_interval=20,
+        ws_ping_timeout=20
     )
\ No newline at end of file
@@ -1,60 +1,92 @@
+import functools
 import socket
 import pymysql
 import requests
 import json
 from urllib.parse import urlparse
 
+@functools.lru_cache(maxsize=128)
+def _resolve(host, port):
+    """Every TCP address for host:port, in resolver order; cached so repeated probes skip DNS"""
+    infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM, proto=socket.IPPROTO_TCP)
+    return tuple(dict.fromkeys(info[4][0] for info in infos))
+
+# Open connections per exact target, so repeated probes in one process skip
+# the TCP + MySQL auth handshake; different targets never share a connection
+_connections = {}
+
+def _get_connection(ip, port, username, password, database):
+    key = (ip, port, username, password, database)
+    connection = _connections.get(key)
+    if connection is not None:
+        try:
+            connection.ping(reconnect=False)
+            return connection
+        except pymysql.Error:
+            _connections.pop(key, None)
+    connection = pymysql.connect(
+        host=ip,
+        port=port,
+        user=username,
+        password=password,
+        database=database,
+        connect_timeout=5,
+        read_timeout=10
+    )
+    _connections[key] = connection
+    return connection
+
 def test_mysql_connection(host, port, username, password, database):
     print("🔍 Testing MySQL Connection...")
     
-    # Test DNS Resolution
+    # Resolve once; the port probe and pymysql both reuse the address
     try:
-        ip = socket.gethostbyname(host)
-        print(f"✅ DNS Resolution: {host} -> {ip}")
+        addresses = _resolve(host, port)
+        print(f"✅ DNS Resolution: {host} -> {', '.join(addresses)}")
     except socket.gaierror as e:
         print(f"❌ DNS Resolution Failed: {e}")
         return False
 
-    # Test Port Connectivity
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(10)
-        result = sock.connect_ex((host, port))
-        sock.close()
-        
-        if result == 0:
-            print(f"✅ Port {port} is open")
-        else:
-            print(f"❌ Port {port} is closed (error: {result})")
-            return False
-    except Exception as e:
-        print(f"❌ Port test failed: {e}")
+    # TCP reachability with a short deadline, trying each address in turn like
+    # create_connection does (e.g. localhost -> ::1 first, MySQL on 127.0.0.1 only)
+    ip = None
+    for address in addresses:
+        try:
+            with socket.create_connection((address, port), timeout=3):
+                ip = address
+                break
+        except OSError as e:
+            error = e
+    if ip is None:
+        print(f"❌ Port {port} is not reachable: {error}")
         return False
+    print(f"✅ Port {port} is open on {ip}")
 
     # Test MySQL Connection
     try:
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=username,
-            password=password,
-            database=database,
-            connect_timeout=20,
-            read_timeout=30
-        )
+        connection = _get_connection(ip, port, username, password, database)
         print("✅ MySQL Connection: SUCCESS")
         
-        # Test basic query
+        # Test basic query; counted server-side instead of fetching every table name
         with connection.cursor() as cursor:
-            cursor.execute("SHOW TABLES")
-            tables = cursor.fetchall()
-            print(f"✅ Database accessible. Found {len(tables)} tables")
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = %s",
+                (database,)
+            )
+            (count,) = cursor.fetchone()
+            print(f"✅ Database accessible. Found {count} tables")
         
-        connection.close()
         return True
         
     except pymysql.Error as e:
         print(f"❌ MySQL Connection Failed: {e}")
+        # Never hand a connection that just failed to the next probe
+        stale = _connections.pop((ip, port, username, password, database), None)
+        if stale is not None:
+            try:
+                stale.close()
+            except pymysql.Error:
+                pass
         return False
 
 # Test your connection